@@ -9,6 +9,9 @@ import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
 
+from utils.budget import budgeted
+from utils.primes import prime_factors
+
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
@@ -25,12 +28,27 @@ app.layout = html.Div(components)
     [Output('out', 'children'), Output('err', 'children')],
     [Input('num', 'value')]
 )
+# factoring a big enough number takes arbitrarily long, so give up after a
+# second and keep showing the previous answer. Answers are kept in this
+# process, since the child that factored the number exits
+@budgeted(
+    timeout=1, cache_size=1024,
+    fallback=lambda num: (dash.no_update, '{} takes too long to factor'.format(num))
+)
 def show_factors(num):
     if num is None:
         # PreventUpdate prevents ALL outputs from updating
         raise dash.exceptions.PreventUpdate
 
-    factors = prime_factors(num)
+    # step=1 is only a hint to the browser, so 2.5 can still arrive
+    if isinstance(num, float) and not num.is_integer():
+        return dash.no_update, '{} is not a whole number'.format(num)
+
+    if num < 2:
+        return dash.no_update, '{} has no prime factors'.format(num)
+
+    # exact integer arithmetic - see utils/primes.py
+    factors = prime_factors(int(num))
 
     if len(factors) == 1:
         # dash.no_update prevents any single ouotput from updating
@@ -39,17 +57,5 @@ def show_factors(num):
     return '{} is {}'.format(num, ' * '.join(str(n) for n in factors)), ''
 
 
-def prime_factors(num):
-    n, i, out = num, 2, []
-    while i * i <= n:
-        if n % i == 0:
-            n = int(n / i)
-            out.append(i)
-        else:
-            i += 1 if i == 2 else 2
-    out.append(n)
-    return out
-
-
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
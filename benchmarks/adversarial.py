@@ -0,0 +1,136 @@
+'''
+Availability of budgeted callbacks under adversarial input.
+
+Imports callbacks/multiple_outputs.py and advanced_callbacks/no_update.py,
+whose callbacks run under utils.budget, and keeps --attackers threads
+sending them inputs that would otherwise tie up a worker indefinitely:
+x = 10**6 for x**x, and a product of three large primes to factor. Meanwhile
+one thread sends ordinary inputs and records how long they take. Ordinary
+numbers to factor are all different, so none is answered from the worker's
+cache of results without forking.
+
+Prints the latency of the ordinary requests and what the adversarial ones
+got back. Exits with status 1 if an ordinary request took longer than a
+budget's timeout plus --slack seconds, got a wrong answer, or if child
+processes were left running afterwards.
+
+With more attackers than utils.budget.MAX_CONCURRENT - 1, ordinary requests
+have to wait for a slot and may get the fallback.
+
+Run with: python -m benchmarks.adversarial [--attackers N] [--duration 10]
+'''
+
+import argparse
+import json
+import multiprocessing
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.harness import ROOT, load_app
+from utils import budget
+from utils.primes import small_primes
+
+# both callbacks have a one-second budget
+TIMEOUT = 1.0
+
+
+def ordinary_semiprime(i):
+    # show_factors keeps the answers it has given, so each ordinary request
+    # needs a number it hasn't factored yet to go through a child process
+    p = small_primes()[i]
+    value = p * 1000000007
+    return value, {'out': {'children': f'{value} is {p} * 1000000007'}}
+
+APPS = {
+    'multiple_outputs': {
+        'path': 'callbacks/multiple_outputs.py',
+        'output': 'x^x.children',
+        'input': ('num-multi', 'value'),
+        'ordinary': lambda i: (7, {'x^x': {'children': 823543}}),
+        'adversarial': 10**6
+    },
+    'no_update': {
+        'path': 'advanced_callbacks/no_update.py',
+        'output': '..out.children...err.children..',
+        'input': ('num', 'value'),
+        'ordinary': ordinary_semiprime,
+        'adversarial': (2**89 - 1) * (2**107 - 1) * (2**127 - 1)
+    }
+}
+
+
+def post(client, spec, value):
+    component_id, prop = spec['input']
+    response = client.post('/_dash-update-component', json={
+        'output': spec['output'],
+        'inputs': [{'id': component_id, 'property': prop, 'value': value}],
+        'state': [],
+        'changedPropIds': [f'{component_id}.{prop}']
+    })
+    return response.status_code, json.loads(response.data).get('response', {}) if response.status_code == 200 else {}
+
+
+def attack(app, spec, stop, outcomes):
+    client = app.server.test_client()
+    while not stop.is_set():
+        status, response = post(client, spec, spec['adversarial'])
+        outcomes.append((status, json.dumps(response)[:60]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    # by default, leave one budget slot for the ordinary requests
+    parser.add_argument('--attackers', type=int, default=budget.MAX_CONCURRENT - 1,
+                        help='threads sending adversarial input per app')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to attack each app for')
+    parser.add_argument('--slack', type=float, default=1.0, help='allowed latency above the budget')
+    args = parser.parse_args()
+
+    failed = False
+    for name, spec in APPS.items():
+        app = load_app(f'{name}_under_attack', f'{ROOT}/{spec["path"]}')
+        stop = threading.Event()
+        outcomes = []
+        attackers = [
+            threading.Thread(target=attack, args=(app, spec, stop, outcomes)) for _ in range(args.attackers)
+        ]
+        for t in attackers:
+            t.start()
+
+        client = app.server.test_client()
+        latencies, wrong = [], 0
+        deadline = time.perf_counter() + args.duration
+        while time.perf_counter() < deadline:
+            value, expected = spec['ordinary'](len(latencies))
+            start = time.perf_counter()
+            status, response = post(client, spec, value)
+            latencies.append(time.perf_counter() - start)
+            if status != 200 or any(response.get(k) != v for k, v in expected.items()):
+                wrong += 1
+
+        stop.set()
+        for t in attackers:
+            t.join()
+        leftover = multiprocessing.active_children()
+
+        p50, p99, worst = np.percentile(latencies, [50, 99, 100])
+        print(f'{name}: {len(latencies)} ordinary requests  p50 {p50 * 1e3:.0f} ms  '
+              f'p99 {p99 * 1e3:.0f} ms  max {worst * 1e3:.0f} ms  wrong {wrong}')
+        summary = {}
+        for outcome in outcomes:
+            summary[outcome] = summary.get(outcome, 0) + 1
+        for (status, response), count in sorted(summary.items(), key=lambda item: -item[1]):
+            print(f'    {count:5} adversarial -> {status} {response}')
+
+        if worst > TIMEOUT + args.slack or wrong or leftover:
+            print(f'    FAILED: max latency {worst:.2f} s, {wrong} wrong, {len(leftover)} processes left')
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
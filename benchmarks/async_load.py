@@ -0,0 +1,171 @@
+'''
+Concurrent slow requests held by one process: async vs. thread-pool callbacks.
+
+Serves a small app from utils.async_server in a child process. The app has
+two callbacks that each wait one second, one `async def` awaiting
+asyncio.sleep and one ordinary function calling time.sleep, which runs in
+the server's pool of --threads threads. For each, --requests clients post
+to it at once over their own connections.
+
+Prints how long the whole burst took, how many responses came back OK, and
+the server's thread count and peak RSS during the burst. All async requests
+should finish in about one second, with no more threads than the pool; the
+sync ones queue for the pool, taking requests / threads seconds.
+
+Run with: python -m benchmarks.async_load [--requests 2000] [--threads 32]
+'''
+
+import argparse
+import asyncio
+import json
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.harness import ROOT
+
+DELAY = 1.0
+
+
+def build_app():
+    import dash
+    from dash.dependencies import Input, Output
+    import dash_html_components as html
+    import flask
+
+    from utils.async_server import AsyncCallbacks
+
+    app = dash.Dash(__name__)
+    app.layout = html.Div([
+        html.Div(id='async-in'), html.Div(id='async-out'),
+        html.Div(id='sync-in'), html.Div(id='sync-out')
+    ])
+    async_callbacks = AsyncCallbacks(app)
+
+    @async_callbacks.callback(Output('async-out', 'children'), [Input('async-in', 'children')])
+    async def wait_async(value):
+        await asyncio.sleep(DELAY)
+        return value
+
+    @app.callback(Output('sync-out', 'children'), [Input('sync-in', 'children')])
+    def wait_sync(value):
+        time.sleep(DELAY)
+        return value
+
+    @app.server.route('/_stats')
+    def stats():
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return flask.jsonify(threads=threading.active_count(), peak_rss=rss)
+
+    return async_callbacks
+
+
+def raise_file_limit():
+    # each connection takes a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+async def request(host, port, method, path, body=b''):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (f'{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n')
+        writer.write(head.encode() + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    status_line, _, rest = response.partition(b'\r\n')
+    return int(status_line.split()[1]), rest.partition(b'\r\n\r\n')[2]
+
+
+async def burst(host, port, kind, n):
+    body = json.dumps({
+        'output': f'{kind}-out.children',
+        'outputs': {'id': f'{kind}-out', 'property': 'children'},
+        'inputs': [{'id': f'{kind}-in', 'property': 'children', 'value': 'ok'}],
+        'changedPropIds': [f'{kind}-in.children'],
+        'state': []
+    }).encode()
+
+    peak_threads = 0
+
+    async def watch():
+        nonlocal peak_threads
+        while True:
+            _, stats = await request(host, port, 'GET', '/_stats')
+            peak_threads = max(peak_threads, json.loads(stats)['threads'])
+            await asyncio.sleep(0.1)
+
+    watcher = asyncio.ensure_future(watch())
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[request(host, port, 'POST', '/_dash-update-component', body) for _ in range(n)],
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    watcher.cancel()
+
+    _, stats = await request(host, port, 'GET', '/_stats')
+    ok = sum(1 for r in results if not isinstance(r, Exception) and r[0] == 200)
+    return elapsed, ok, peak_threads, json.loads(stats)['peak_rss']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(host, port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('the server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--sync-requests', type=int, default=256, help='requests to the sync callback')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    limit = raise_file_limit()
+    host = '127.0.0.1'
+
+    if args.serve:
+        asyncio.run(build_app().serve(host, args.serve, max_threads=args.threads))
+        return
+
+    if args.requests * 2 + 100 > limit:
+        print(f'warning: {args.requests} connections may hit the open file limit of {limit}')
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.async_load', '--serve', str(port), '--threads', str(args.threads)],
+        cwd=ROOT
+    )
+    try:
+        wait_for(host, port)
+        print(f'{"callback":<8}{"requests":>10}{"seconds":>10}{"ok":>8}{"threads":>9}{"rss MB":>9}')
+        for kind, n in (('async', args.requests), ('sync', args.sync_requests)):
+            elapsed, ok, threads, rss = asyncio.run(burst(host, port, kind, n))
+            print(f'{kind:<8}{n:>10}{elapsed:>10.2f}{ok:>8}{threads:>9}{rss / 2**20:>9.0f}')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
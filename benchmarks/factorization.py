@@ -0,0 +1,85 @@
+'''
+Factorization time by input size: trial division vs. utils.primes.
+
+For each size, factors semiprimes with two prime factors of the same size,
+the worst case for both, as well as random ints. Trial division is the
+version no_update.py used to have, with exact integer division, and is only
+run while it finishes in a few seconds. Every result is checked against its
+input, and utils.primes is called with an empty memo.
+
+Run with: python -m benchmarks.factorization [--max-digits 24]
+'''
+
+import argparse
+import math
+import random
+import time
+
+from utils import primes
+
+# trial division takes seconds per semiprime past this, and minutes by 18 digits
+TRIAL_DIVISION_MAX_DIGITS = 14
+
+
+def trial_division(num):
+    n, i, out = num, 2, []
+    while i * i <= n:
+        if n % i == 0:
+            n //= i
+            out.append(i)
+        else:
+            i += 1 if i == 2 else 2
+    out.append(n)
+    return out
+
+
+def random_prime(digits, rng):
+    while True:
+        p = rng.randrange(10**(digits - 1), 10**digits) | 1
+        if primes.is_prime(p):
+            return p
+
+
+def measure(factorize, numbers):
+    worst = 0
+    for n in numbers:
+        primes._factorize.cache_clear()
+        start = time.perf_counter()
+        factors = factorize(n)
+        worst = max(worst, time.perf_counter() - start)
+        assert math.prod(factors) == n and all(primes.is_prime(f) for f in factors), n
+    return worst * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-digits', type=int, default=24)
+    parser.add_argument('--count', type=int, default=5, help='numbers of each kind per size')
+    args = parser.parse_args()
+
+    # the sieve is built once per process, so don't count it
+    primes.small_primes()
+
+    rng = random.Random(0)
+    print(f'{"digits":>6}  {"kind":<10}{"trial ms":>12}{"primes ms":>12}   (worst of {args.count})')
+    for digits in range(6, args.max_digits + 1, 3):
+        kinds = {
+            'semiprime': [
+                random_prime(digits // 2, rng) * random_prime(digits - digits // 2, rng)
+                for _ in range(args.count)
+            ],
+            'random': [rng.randrange(10**(digits - 1), 10**digits) for _ in range(args.count)]
+        }
+        for kind, numbers in kinds.items():
+            trial = measure(trial_division, numbers) if digits <= TRIAL_DIVISION_MAX_DIGITS else None
+            trial = f'{trial:12.2f}' if trial is not None else f'{"-":>12}'
+            print(f'{digits:>6}  {kind:<10}{trial}{measure(primes.prime_factors, numbers):12.2f}')
+
+    # far past float precision, the factors are still exact
+    n = (2**89 - 1) * (2**31 - 1)**2 * 3**50 * 1000003
+    assert math.prod(primes.prime_factors(n)) == n
+    print(f'\n(2**89 - 1) * (2**31 - 1)**2 * 3**50 * 1000003: {measure(primes.prime_factors, [n]):.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+'''
+Payload size and encode time of the tutorial figures under each encoder.
+
+ * plotly  - Dash's default, json.dumps with plotly's JSON encoder
+ * orjson  - utils.encoding.dumps on the figure as built
+ * typed   - utils.encoding.typed_arrays, then utils.encoding.dumps
+
+Run with: python -m benchmarks.figure_encoding
+'''
+
+import json
+import time
+
+import plotly.utils
+
+from benchmarks.fixtures import country_indicators, gapminder
+from utils import encoding
+from utils.indicators import IndicatorCube
+
+
+def indicator_figure(n_countries):
+    cube = IndicatorCube(country_indicators(n_countries=n_countries, n_indicators=4))
+    countries, x, y = cube.scatter('Indicator 0', 'Indicator 1', 2007)
+    return {'data': [dict(x=x, y=y, text=countries, mode='markers')]}
+
+
+def gapminder_figure(n_countries):
+    df = gapminder(n_countries=n_countries)
+    return {'data': [
+        dict(x=dff.gdpPercap, y=dff.lifeExp, text=dff.country, mode='markers', name=c)
+        for c, dff in df.groupby('continent')
+    ]}
+
+
+def plotly_dumps(figure):
+    return json.dumps(figure, cls=plotly.utils.PlotlyJSONEncoder).encode('utf-8')
+
+
+def typed_dumps(figure):
+    return encoding.dumps(encoding.typed_arrays(figure))
+
+
+def measure(encode, figure, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = encode(figure)
+    return len(payload), (time.perf_counter() - start) / repeat * 1e3
+
+
+def main():
+    figures = [
+        ('country_indicators', indicator_figure(250)),
+        ('country_indicators x100', indicator_figure(25000)),
+        ('gapminder', gapminder_figure(142)),
+        ('gapminder x100', gapminder_figure(14200)),
+    ]
+    encoders = [('plotly', plotly_dumps), ('orjson', encoding.dumps), ('typed', typed_dumps)]
+
+    for name, figure in figures:
+        print(name)
+        for encoder_name, encode in encoders:
+            size, ms = measure(encode, figure)
+            print(f'    {encoder_name:<8} {size:>12,} bytes  {ms:9.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+'''
+Synthetic stand-ins for the tutorial datasets, shaped like the real CSVs.
+'''
+
+import numpy as np
+import pandas as pd
+
+
+def country_indicators(n_countries=250, n_indicators=20, years=range(1962, 2012, 5), seed=0):
+    '''
+    Long-format frame with the columns of country_indicators.csv.
+    '''
+    rng = np.random.RandomState(seed)
+    countries = [f'Country {i}' for i in range(n_countries)]
+    indicators = [f'Indicator {i}' for i in range(n_indicators)]
+    years = list(years)
+
+    index = pd.MultiIndex.from_product(
+        [countries, indicators, years],
+        names=['Country Name', 'Indicator Name', 'Year']
+    )
+    df = index.to_frame(index=False)
+    df['Value'] = rng.lognormal(size=len(df))
+
+    # the real file is not sorted by country, so don't hand the index a head start
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def gapminder(n_countries=142, years=range(1952, 2008, 5), seed=0):
+    '''
+    Frame with the columns of gapminderDataFiveYear.csv.
+    '''
+    rng = np.random.RandomState(seed)
+    continents = ['Asia', 'Europe', 'Africa', 'Americas', 'Oceania']
+    years = list(years)
+
+    df = pd.DataFrame({
+        'country': np.repeat([f'Country {i}' for i in range(n_countries)], len(years)),
+        'year': np.tile(years, n_countries),
+        'continent': np.repeat(rng.choice(continents, n_countries), len(years))
+    })
+    df['pop'] = rng.randint(10**5, 10**9, len(df)).astype(float)
+    df['lifeExp'] = rng.uniform(25, 85, len(df))
+    df['gdpPercap'] = rng.lognormal(8, 1, len(df))
+    return df[['country', 'year', 'pop', 'continent', 'lifeExp', 'gdpPercap']]
+
+
+def gdp_life_exp(n_countries=142, seed=0):
+    '''
+    Frame with the columns of gdp-life-exp-2007.csv.
+    '''
+    rng = np.random.RandomState(seed)
+    continents = ['Asia', 'Europe', 'Africa', 'Americas', 'Oceania']
+
+    return pd.DataFrame({
+        'country': [f'Country {i}' for i in range(n_countries)],
+        'continent': rng.choice(continents, n_countries),
+        'population': rng.randint(10**5, 10**9, n_countries).astype(float),
+        'life expectancy': rng.uniform(40, 85, n_countries),
+        'gdp per capita': rng.lognormal(8, 1, n_countries)
+    })
+
+
+def agricultural_exports(n_states=50, seed=0):
+    '''
+    Frame with the columns of usa-agricultural-exports-2011.csv.
+    '''
+    rng = np.random.RandomState(seed)
+    products = ['beef', 'pork', 'poultry', 'dairy', 'fruits fresh', 'fruits proc',
+                'total fruits', 'veggies fresh', 'veggies proc', 'total veggies',
+                'corn', 'wheat', 'cotton']
+
+    df = pd.DataFrame({'state': [f'State {i}' for i in range(n_states)]})
+    for product in products:
+        df[product] = rng.lognormal(4, 1.5, n_states).round(2)
+    df.insert(1, 'total exports', df[products].sum(axis=1).round(2))
+    return df
@@ -0,0 +1,420 @@
+'''
+Headless benchmark of every tutorial app's callbacks.
+
+Each app module under callbacks/, advanced_callbacks/, interactive_graphing/,
+sharing_state/ and layout/ is imported in its own worker process, with its
+datasets read from synthetic fixtures (DASH_TUTORIALS_DATA_DIR) and an empty
+cache. Its callbacks are then fired through the Flask test client at
+/_dash-update-component, in the order they were registered, with inputs drawn
+from the options, marks and values in the app's layout (or from INPUTS, for
+graph events and stores the layout can't describe).
+
+For each callback it records p50/p95/p99 latency, mean response bytes, the
+peak memory traced while it ran and how far it raised the worker's peak RSS,
+and compares them with benchmarks/baseline.json. The run exits with status 1
+on a regression, or if the baseline records failed requests.
+
+Run with: python -m benchmarks.harness [--apps callbacks interactive_graphing.update_on_hover]
+Update the baseline with: python -m benchmarks.harness --update-baseline
+'''
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+from benchmarks import fixtures
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_PACKAGES = ['callbacks', 'advanced_callbacks', 'interactive_graphing', 'sharing_state', 'layout']
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+# fixture files, named after the last segment of each dataset's URL
+FIXTURES = {
+    'country_indicators.csv': fixtures.country_indicators,
+    'gapminderDataFiveYear.csv': fixtures.gapminder,
+    'gdp-life-exp-2007.csv': fixtures.gdp_life_exp,
+    'usa-agricultural-exports-2011.csv': fixtures.agricultural_exports
+}
+
+# input values for graph events and stores, which the layout can't describe;
+# a function is called with the app's module, in the worker, to make them
+_zooms = [
+    None,
+    {'xaxis.range[0]': 0.1, 'xaxis.range[1]': 0.6, 'yaxis.range[0]': 0.2, 'yaxis.range[1]': 0.9},
+    {'xaxis.autorange': True, 'yaxis.autorange': True}
+]
+_views = [
+    None,
+    {'x': [0.1, 0.6], 'y': [0.2, 0.9]},
+    {'x': None, 'y': None}
+]
+_rectangles = [
+    None,
+    {'range': {'x': [0.2, 0.6], 'y': [0.1, 0.7]}},
+    {'range': {'x': [0.0, 0.5], 'y': [0.5, 1.0]}}
+]
+
+INPUTS = {
+    'interactive_graphing.update_on_hover': {
+        'crossfilter-indicator-scatter.hoverData': [
+            {'points': [{'customdata': f'Country {i}'}]} for i in range(0, 250, 25)
+        ]
+    },
+    # tokens for frames put in the app's store, as clean_data would
+    'sharing_state.hidden_div': {
+        'intermediate-value.children': lambda module: [
+            module.frame_store.put(module.df[module.df.index != i]) for i in range(3)
+        ]
+    },
+    'interactive_graphing.generic_crossfilter': dict(
+        [(f'{g}-range.data', _rectangles) for g in ('g1', 'g2', 'g3')] +
+        [(f'{g}.relayoutData', _zooms) for g in ('g1', 'g2', 'g3')] +
+        [(f'{g}-view.data', _views) for g in ('g1', 'g2', 'g3')]
+    )
+}
+
+# differences smaller than these are treated as noise
+LATENCY_FLOOR_MS = 5.0
+MEMORY_FLOOR = 8 * 2**20
+
+# budgeted callbacks (utils/budget.py) fork a process per request, and how
+# long that takes varies by tens of milliseconds from run to run
+LATENCY_FLOORS_MS = {
+    'advanced_callbacks.no_update': 25.0,
+    'callbacks.multiple_outputs': 25.0
+}
+
+
+def app_modules(prefixes=None):
+    '''
+    Returns (name, path) for each app module, optionally only those whose
+    name matches or sits under one of `prefixes`.
+    '''
+    modules = []
+    for package in APP_PACKAGES:
+        for filename in sorted(os.listdir(os.path.join(ROOT, package))):
+            if not filename.endswith('.py') or filename == '__init__.py':
+                continue
+            # state.py.py isn't importable by name, so dots become underscores
+            name = package + '.' + filename[:-3].replace('.', '_')
+            if prefixes and not any(name == p or name.startswith(p + '.') for p in prefixes):
+                continue
+            modules.append((name, os.path.join(ROOT, package, filename)))
+    return modules
+
+
+def write_fixtures(data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    for filename, make in FIXTURES.items():
+        make().to_csv(os.path.join(data_dir, filename), index=False)
+
+
+def load_app(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Dash looks the module up by name to find its assets folder
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def walk(component):
+    '''
+    Yields every component with an id in a layout.
+    '''
+    if getattr(component, 'id', None) is not None:
+        yield component
+    for child in component._traverse():
+        if getattr(child, 'id', None) is not None:
+            yield child
+
+
+def candidates(component, prop):
+    '''
+    Returns the input values a user could give `prop` of a layout component.
+    '''
+    value = getattr(component, prop, None)
+
+    if prop == 'value' and getattr(component, 'options', None):
+        values = [option['value'] for option in component.options]
+        return [[v] for v in values] if getattr(component, 'multi', False) else values
+
+    if prop == 'value' and getattr(component, 'marks', None):
+        return [float(mark) if '.' in str(mark) else int(mark) for mark in component.marks]
+
+    if prop in ('n_clicks', 'n_intervals'):
+        return list(range(1, 11))
+
+    if prop == 'value' and getattr(component, 'type', None) == 'number':
+        return list(range(1, 101))
+
+    return [value]
+
+
+def percentiles(latencies):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {'p50_ms': p50 * 1e3, 'p95_ms': p95 * 1e3, 'p99_ms': p99 * 1e3}
+
+
+def peak_rss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class Driver:
+    '''
+    Fires one app's callbacks through the Flask test client, keeping track of
+    the props they set so later callbacks see them, as in the browser.
+    '''
+
+    def __init__(self, name, app, seed=0):
+        self.app = app
+        self.client = app.server.test_client()
+        self.url = app.config.requests_pathname_prefix + '_dash-update-component'
+        module = sys.modules[name]
+        self.overrides = {
+            prop_id: values(module) if callable(values) else values
+            for prop_id, values in INPUTS.get(name, {}).items()
+        }
+        self.rng = random.Random(seed)
+
+        layout = app.layout() if callable(app.layout) else app.layout
+        self.components = {c.id: c for c in walk(layout)}
+        self.props = {}
+
+    def value(self, dependency):
+        prop_id = f"{dependency['id']}.{dependency['property']}"
+        if prop_id in self.props:
+            return self.props[prop_id]
+        component = self.components.get(dependency['id'])
+        return getattr(component, dependency['property'], None)
+
+    def choices(self, dependency):
+        prop_id = f"{dependency['id']}.{dependency['property']}"
+        if prop_id in self.overrides:
+            return self.overrides[prop_id]
+        if prop_id in self.props:
+            return [self.props[prop_id]]
+        component = self.components.get(dependency['id'])
+        return candidates(component, dependency['property']) if component is not None else [None]
+
+    def samples(self, spec, n):
+        '''
+        Returns `n` random request bodies for a callback.
+        '''
+        choices = [self.choices(i) for i in spec['inputs']]
+        previous = None
+        bodies = []
+        for _ in range(n):
+            values = [self.rng.choice(c) for c in choices]
+            inputs = [dict(i, value=v) for i, v in zip(spec['inputs'], values)]
+            # only the inputs that changed since the last call triggered this one
+            changed = [
+                f"{i['id']}.{i['property']}" for j, i in enumerate(inputs)
+                if previous is None or previous[j] != values[j]
+            ]
+            bodies.append({
+                'inputs': inputs,
+                'state': [dict(s, value=self.value(s)) for s in spec.get('state', [])],
+                'changedPropIds': changed or [f"{inputs[0]['id']}.{inputs[0]['property']}"]
+            })
+            previous = values
+        return bodies
+
+    def fire(self, output, body):
+        data = json.dumps(dict(body, output=output), cls=PlotlyJSONEncoder)
+        response = self.client.post(self.url, data=data, content_type='application/json')
+
+        if response.status_code == 200:
+            for component_id, props in response.get_json()['response'].items():
+                for prop, value in props.items():
+                    self.props[f'{component_id}.{prop}'] = value
+        return response
+
+    def run(self, repeat=50, warmup=3):
+        results = {}
+        for output, spec in self.app.callback_map.items():
+            if 'callback' not in spec:
+                continue
+
+            bodies = self.samples(spec, warmup + repeat)
+            # the peak RSS is per process, so only its growth belongs to this callback
+            rss_before = peak_rss()
+            for body in bodies[:warmup]:
+                self.fire(output, body)
+
+            latencies = []
+            sizes = []
+            errors = 0
+            for body in bodies[warmup:]:
+                start = time.perf_counter()
+                response = self.fire(output, body)
+                latencies.append(time.perf_counter() - start)
+                sizes.append(len(response.data))
+                # 204 is PreventUpdate, which is a normal outcome
+                errors += response.status_code not in (200, 204)
+
+            # tracing slows callbacks down, so memory gets its own short pass
+            tracemalloc.start()
+            for body in bodies[warmup:warmup + 5]:
+                self.fire(output, body)
+            peak_alloc = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[output] = dict(
+                percentiles(latencies),
+                calls=len(latencies),
+                errors=errors,
+                bytes=int(np.mean(sizes)),
+                peak_alloc=peak_alloc,
+                rss_growth=peak_rss() - rss_before
+            )
+        return results
+
+
+def run_worker(name, output, repeat, warmup, seed):
+    path = dict(app_modules())[name]
+    app = load_app(name, path)
+    results = Driver(name, app, seed).run(repeat, warmup)
+
+    with open(output, 'w') as f:
+        json.dump({f'{name}:{key}': result for key, result in results.items()}, f)
+
+
+def run_all(modules, repeat, warmup, seed):
+    '''
+    Benchmarks each app in a fresh worker process against the fixtures.
+    Returns the results and a list of apps that failed to run.
+    '''
+    results = {}
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, 'data')
+        write_fixtures(data_dir)
+
+        for name, _ in modules:
+            output = os.path.join(tmp, name + '.json')
+            env = dict(
+                os.environ,
+                DASH_TUTORIALS_DATA_DIR=data_dir,
+                DASH_TUTORIALS_CACHE_DIR=os.path.join(tmp, 'cache', name),
+                # the async example's stand-in for a slow remote call
+                DASH_TUTORIALS_ASYNC_DELAY='0.01',
+                PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))
+            )
+            command = [
+                sys.executable, '-m', 'benchmarks.harness', '--worker', name, '--output', output,
+                '--repeat', str(repeat), '--warmup', str(warmup), '--seed', str(seed)
+            ]
+            print(f'running {name}', file=sys.stderr)
+            if subprocess.run(command, cwd=ROOT, env=env).returncode != 0:
+                failures.append(name)
+                continue
+
+            with open(output) as f:
+                results.update(json.load(f))
+
+    return results, failures
+
+
+def compare(results, baseline, tolerance):
+    '''
+    Returns a description of each way `results` is worse than `baseline`.
+    '''
+    regressions = []
+    for key, result in sorted(results.items()):
+        base = baseline.get(key, {})
+
+        if base.get('errors'):
+            regressions.append(f"{key}: the baseline records {base['errors']} failed requests")
+        if result['errors']:
+            regressions.append(f"{key}: {result['errors']} of {result['calls']} requests failed")
+        if not base:
+            continue
+
+        latency_floor = LATENCY_FLOORS_MS.get(key.split(':')[0], LATENCY_FLOOR_MS)
+        for metric, floor in [('p50_ms', latency_floor), ('p95_ms', latency_floor),
+                              ('bytes', 0), ('peak_alloc', MEMORY_FLOOR),
+                              ('rss_growth', MEMORY_FLOOR)]:
+            new, old = result[metric], base[metric]
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append(f'{key}: {metric} {old:,.1f} -> {new:,.1f}')
+
+    return regressions
+
+
+def report(results):
+    print(f"{'callback':<72}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'bytes':>11}{'alloc MB':>10}{'+rss MB':>9}")
+    for key, r in sorted(results.items()):
+        print(f"{key[:71]:<72}{r['p50_ms']:9.2f}{r['p95_ms']:9.2f}{r['p99_ms']:9.2f}"
+              f"{r['bytes']:>11,}{r['peak_alloc'] / 2**20:10.1f}{r['rss_growth'] / 2**20:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apps', nargs='*', help='app modules or packages to run, e.g. callbacks.slider')
+    parser.add_argument('--repeat', type=int, default=50, help='timed requests per callback')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed requests per callback')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed fractional increase over the baseline')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='record these results as the new baseline')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.output, args.repeat, args.warmup, args.seed)
+        return
+
+    results, failures = run_all(app_modules(args.apps), args.repeat, args.warmup, args.seed)
+    report(results)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = [f'{name}: failed to run' for name in failures]
+
+    if args.update_baseline:
+        # a baseline that allows failures would hide them from every later run
+        regressions += [
+            f"{key}: {result['errors']} of {result['calls']} requests failed"
+            for key, result in sorted(results.items()) if result['errors']
+        ]
+        if not regressions:
+            baseline.update(results)
+            with open(args.baseline, 'w') as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+            print(f'\nbaseline written to {args.baseline}')
+    else:
+        regressions += compare(results, baseline, args.tolerance)
+
+    if regressions:
+        print('\nregressions:')
+        for regression in regressions:
+            print(f' * {regression}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
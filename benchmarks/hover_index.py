@@ -0,0 +1,64 @@
+'''
+Hover callback latency with and without the per-country series index.
+
+Compares the boolean-mask lookup that update_x_timeseries used to do with
+SeriesIndex.series(), including building the time series figure.
+
+Run with: python -m benchmarks.hover_index
+'''
+
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import country_indicators
+from utils.indicators import SeriesIndex
+
+
+def figure(years, values):
+    return {'data': [{'x': years, 'y': values, 'mode': 'lines+markers'}]}
+
+
+def masked(df, country, indicator):
+    dff = df[df['Country Name'] == country]
+    dff = dff[dff['Indicator Name'] == indicator]
+    return figure(dff['Year'], dff['Value'])
+
+
+def indexed(index, country, indicator):
+    return figure(*index.series(country, indicator))
+
+
+def timeit(fn, args, repeat):
+    samples = []
+    for a in args[:repeat]:
+        start = time.perf_counter()
+        fn(*a)
+        samples.append(time.perf_counter() - start)
+    return np.percentile(samples, [50, 95]) * 1e3
+
+
+def main():
+    for n_countries in (250, 2500):
+        df = country_indicators(n_countries=n_countries)
+
+        start = time.perf_counter()
+        index = SeriesIndex(df)
+        build = (time.perf_counter() - start) * 1e3
+
+        rng = np.random.RandomState(1)
+        hovers = [
+            (f'Country {rng.randint(n_countries)}', f'Indicator {rng.randint(20)}')
+            for _ in range(200)
+        ]
+
+        before = timeit(lambda c, i: masked(df, c, i), hovers, 200)
+        after = timeit(lambda c, i: indexed(index, c, i), hovers, 200)
+
+        print(f'{len(df):>9,} rows  index build {build:7.1f} ms')
+        print(f'    masks   p50 {before[0]:8.3f} ms  p95 {before[1]:8.3f} ms')
+        print(f'    index   p50 {after[0]:8.3f} ms  p95 {after[1]:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
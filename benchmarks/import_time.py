@@ -0,0 +1,108 @@
+'''
+Cold-start import time of the tutorial apps, aggregated from -X importtime.
+
+Each app module is imported in a fresh interpreter with -X importtime, with
+its datasets read from the fixtures through an already filled cache, once
+per startup mode (DASH_TUTORIALS_STARTUP=eager and lazy). The report shows
+the wall time of the import and the self time of every imported module
+summed by top-level package, so that e.g. pandas showing up in lazy mode
+stands out.
+
+Each measurement is the best of --repeat runs. Use --json to save the
+numbers for comparison between commits.
+
+Run with: python -m benchmarks.import_time [--apps callbacks.slider] [--top 8] [--json out.json]
+'''
+
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.harness import ROOT, app_modules, write_fixtures
+
+MODES = ['eager', 'lazy']
+
+# imports the app the way the harness does, and prints the wall time
+IMPORT_APP = '''
+import importlib.util, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location(sys.argv[1], sys.argv[2])
+module = importlib.util.module_from_spec(spec)
+sys.modules[sys.argv[1]] = module
+spec.loader.exec_module(module)
+print(time.perf_counter() - start)
+'''
+
+
+def parse_importtime(stderr):
+    '''
+    Sums the self time of each module in -X importtime output by top-level
+    package. Returns {package: seconds}.
+    '''
+    packages = collections.Counter()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1e6
+    return dict(packages)
+
+
+def measure(name, path, env):
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_APP, name, path],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return float(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--apps', nargs='*', help='app modules or packages to measure')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=5, help='packages to list per app')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, 'data')
+        write_fixtures(data_dir)
+        base_env = dict(
+            os.environ,
+            DASH_TUTORIALS_DATA_DIR=data_dir,
+            DASH_TUTORIALS_CACHE_DIR=os.path.join(tmp, 'cache'),
+            PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))
+        )
+
+        for name, path in app_modules(args.apps):
+            for mode in MODES:
+                env = dict(base_env, DASH_TUTORIALS_STARTUP=mode)
+                try:
+                    # the first run fills the cache, the rest are measured
+                    measure(name, path, env)
+                    runs = [measure(name, path, env) for _ in range(args.repeat)]
+                except RuntimeError as e:
+                    print(f'{name} ({mode}): failed - {e}')
+                    break
+
+                wall, packages = min(runs, key=lambda run: run[0])
+                results.setdefault(name, {})[mode] = {'wall': wall, 'packages': packages}
+
+                top = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+                listed = ', '.join(f'{package} {seconds * 1e3:.0f}' for package, seconds in top)
+                print(f'{name:<45}{mode:<7}{wall * 1e3:8.0f} ms   {listed}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
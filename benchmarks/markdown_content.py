@@ -0,0 +1,122 @@
+'''
+Serving a large Markdown document: rendering per request vs. utils.markdown_content.
+
+Generates a Markdown document of headings, paragraphs, lists, code blocks
+and tables of about --size bytes, and serves it through the Flask test
+client three ways:
+
+ * render - markdown.markdown and sanitizing on every request
+ * cached - MarkdownContent's rendered page
+ * 304    - a revalidation with the page's ETag
+
+Prints the median time and body bytes per request, and how long the watcher
+took to pick up an edit. Each section also carries raw HTML the sanitizer
+has to drop - a script and an embed - and the script exits with an error if
+the text after them goes missing from the page.
+
+Run with: python -m benchmarks.markdown_content [--size 1000000]
+'''
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import dash
+import dash_html_components as html
+import flask
+
+from utils import markdown_content
+
+SECTION = '''
+## Section {i}
+
+Some *emphasis*, some **strong text**, a [link](https://example.com/{i}) and `inline code`.
+
+* first point
+* second point, with a <span class="note">bit of html</span>
+
+<script>alert({i})</script><embed src="movie{i}.swf">
+<p>kept after section {i}</p>
+
+```python
+def section_{i}():
+    return {i}
+```
+
+| column | value |
+|--------|-------|
+| a      | {i}   |
+| b      | {j}   |
+'''
+
+
+def document(size):
+    parts, i = ['# Documentation\n'], 0
+    while sum(map(len, parts)) < size:
+        parts.append(SECTION.format(i=i, j=i * 2))
+        i += 1
+    return ''.join(parts)
+
+
+def measure(client, url, repeat, headers=None):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers or {})
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e3, len(response.data), response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10**6, help='bytes of Markdown')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'docs.md')
+        with open(path, 'w') as f:
+            f.write(document(args.size))
+
+        app = dash.Dash(__name__)
+        app.layout = html.Div()
+        content = markdown_content.MarkdownContent(app, poll_interval=0.1)
+        content.register('docs', path)
+
+        @app.server.route('/render-each-time')
+        def render_each_time():
+            with open(path) as f:
+                return flask.Response(markdown_content.render(f.read()), mimetype='text/html')
+
+        client = app.server.test_client()
+        print(f'{os.path.getsize(path):,} bytes of Markdown')
+
+        page = client.get(content.url('docs'))
+        etag = page.headers['ETag']
+
+        # everything the sanitizer drops stays dropped, and nothing else does
+        sections = document(args.size).count('## Section')
+        kept = page.data.count(b'kept after section')
+        if kept != sections or b'alert(' in page.data or b'.swf' in page.data:
+            raise AssertionError(f'sanitizing kept {kept} of {sections} sections, or let a script or embed through')
+        for name, url, headers in [
+            ('render', '/render-each-time', None),
+            ('cached', content.url('docs'), None),
+            ('304', content.url('docs'), {'If-None-Match': etag})
+        ]:
+            ms, size, status = measure(client, url, args.repeat, headers)
+            print(f'  {name:<8}{ms:10.2f} ms {size:>12,} bytes  ({status})')
+
+        # time until an edit is served
+        with open(path, 'a') as f:
+            f.write('\n## Added\n')
+        start = time.perf_counter()
+        while client.get(content.url('docs'), headers={'If-None-Match': etag}).status_code == 304:
+            time.sleep(0.01)
+        print(f'  edit served after {time.perf_counter() - start:.2f} s, including the re-render')
+
+
+if __name__ == '__main__':
+    main()
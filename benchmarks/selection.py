@@ -0,0 +1,107 @@
+'''
+Crossfilter selection cost vs. row count, for utils.selection.SelectionEngine.
+
+Three charts each select a random half of the rows; the engine ANDs the
+masks. Time per row should stay flat as the frame grows to 5M rows. The
+keyed column is SelectionEngine.select_keyed when only one chart's selection
+changed, so the other two masks come from its cache.
+
+Before timing anything, the engine's results are checked against plain
+pandas boolean indexing for intersecting, single and cleared rectangle
+selections, in both select and select_keyed. The script exits with an
+error if they differ.
+
+Run with: python -m benchmarks.selection
+'''
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.selection import SelectionEngine, SortedIndex, rectangle
+
+# (x column, y column) per chart, as in generic_crossfilter.py
+CHARTS = [('a', 'b'), ('c', 'd'), ('e', 'f')]
+
+
+def check(n_rows=100000, seed=1):
+    '''
+    Compares the engine with pandas boolean indexing on random rectangles.
+    '''
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame(rng.rand(n_rows, 6), columns=list('abcdef'))
+    indexes = {col: SortedIndex(df[col].to_numpy()) for col in df.columns}
+    engine = SelectionEngine(n_rows)
+
+    def random_rectangle():
+        x0, y0 = rng.uniform(0, 0.5, 2)
+        return (x0, x0 + rng.uniform(0.2, 0.5)), (y0, y0 + rng.uniform(0.2, 0.5))
+
+    cases = []
+    for _ in range(20):
+        cases.append([random_rectangle() for _ in CHARTS])
+    # single selections and cleared charts
+    cases += [[random_rectangle(), None, None], [None, random_rectangle(), None], [None, None, None]]
+    # one chart changes while the others stay, then a chart is cleared
+    kept = [random_rectangle() for _ in CHARTS]
+    cases += [kept, [kept[0], kept[1], random_rectangle()], [kept[0], None, kept[2]], kept]
+
+    for rectangles in cases:
+        mask = pd.Series(True, index=df.index)
+        for (x_col, y_col), bounds in zip(CHARTS, rectangles):
+            if bounds is not None:
+                (x0, x1), (y0, y1) = bounds
+                mask &= df[x_col].between(x0, x1) & df[y_col].between(y0, y1)
+        expected = df.index[mask].to_numpy()
+
+        rows = [
+            rectangle(indexes[x], indexes[y], *bounds) if bounds is not None else None
+            for (x, y), bounds in zip(CHARTS, rectangles)
+        ]
+        keyed = [
+            (bounds, (lambda x=x, y=y, bounds=bounds: rectangle(indexes[x], indexes[y], *bounds)))
+            for (x, y), bounds in zip(CHARTS, rectangles)
+        ]
+        for name, selected in (('select', engine.select(rows)), ('select_keyed', engine.select_keyed(keyed))):
+            if not np.array_equal(selected, expected):
+                raise AssertionError(f'{name} disagrees with pandas for {rectangles}')
+
+    print(f'{len(cases)} selections match pandas boolean indexing')
+
+
+def main():
+    check()
+    rng = np.random.RandomState(0)
+
+    print(f'{"rows":>10}  {"select":>10}  {"keyed":>10}  {"ns/row":>7}  {"selected":>9}')
+    for n_rows in (10**6, 2 * 10**6, 3 * 10**6, 4 * 10**6, 5 * 10**6):
+        engine = SelectionEngine(n_rows)
+        selections = [np.flatnonzero(rng.rand(n_rows) < 0.5) for _ in range(3)]
+
+        samples = []
+        for _ in range(5):
+            start = time.perf_counter()
+            selected = engine.select(selections)
+            samples.append(time.perf_counter() - start)
+        best = min(samples)
+
+        # the first two charts keep their selection, the third changes each time
+        keyed_samples = []
+        for i in range(5):
+            changed = np.flatnonzero(rng.rand(n_rows) < 0.5)
+            keyed = [
+                ('first', lambda: selections[0]),
+                ('second', lambda: selections[1]),
+                (('third', i), lambda: changed)
+            ]
+            start = time.perf_counter()
+            engine.select_keyed(keyed)
+            keyed_samples.append(time.perf_counter() - start)
+
+        print(f'{n_rows:>10,}  {best * 1e3:7.1f} ms  {min(keyed_samples[1:]) * 1e3:7.1f} ms  '
+              f'{best / n_rows * 1e9:7.2f}  {len(selected):>9,}')
+
+
+if __name__ == '__main__':
+    main()
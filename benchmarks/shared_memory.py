@@ -0,0 +1,112 @@
+'''
+Memory cost of each extra worker holding a dataset, copied vs. shared.
+
+Starts 1 and then 4 worker processes that each load a synthetic
+country_indicators frame through utils.datasets.read_csv and touch every
+column, as an app would. With shared=False every worker decodes its own copy;
+with shared=True every worker maps the same cache entry read-only.
+
+For two dataset sizes, it prints the private memory each worker added by
+loading the frame, the workers' combined proportional set size (PSS), which
+counts shared pages once, and what each worker beyond the first adds to it.
+Shared, the last should stay flat as the dataset grows. Linux only, since it
+reads /proc/self/smaps_rollup.
+
+Run with: python -m benchmarks.shared_memory
+'''
+
+import multiprocessing
+import os
+import tempfile
+
+from benchmarks import fixtures
+
+URL = 'https://plotly.github.io/datasets/country_indicators.csv'
+
+
+def memory():
+    '''
+    Returns this process's private and proportional memory in bytes.
+    '''
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return fields['Private_Clean'] + fields['Private_Dirty'], fields['Pss']
+
+
+def worker(data_dir, cache_dir, shared, barrier, results):
+    # imported first, so that only the frame is measured
+    import pandas
+    from utils import datasets
+
+    before, _ = memory()
+    df = datasets.read_csv(URL, cache_dir=cache_dir, data_dir=data_dir, shared=shared)
+
+    # read every column, as building figures and lookups would, without
+    # allocating much along the way
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pandas.CategoricalDtype):
+            values = values.cat.codes
+        if values.dtype.kind in 'biuf':
+            values.sum()
+        else:
+            values.nunique()
+
+    # measure once every worker has mapped the frame, and stay alive until
+    # every worker has measured, so that shared pages count as shared
+    barrier.wait()
+    private, pss = memory()
+    results.put((private - before, pss))
+    barrier.wait()
+
+
+def run(data_dir, cache_dir, shared, n_workers, context):
+    barrier = context.Barrier(n_workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(data_dir, cache_dir, shared, barrier, results))
+        for _ in range(n_workers)
+    ]
+    for p in processes:
+        p.start()
+    measured = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    return max(m[0] for m in measured), sum(m[1] for m in measured)
+
+
+def main():
+    from utils import datasets
+
+    context = multiprocessing.get_context('spawn')
+
+    for n_countries in (500, 2000):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, 'data')
+            cache_dir = os.path.join(tmp, 'cache')
+            os.makedirs(data_dir)
+
+            df = fixtures.country_indicators(n_countries=n_countries, n_indicators=50)
+            df.to_csv(os.path.join(data_dir, 'country_indicators.csv'), index=False)
+            print(f'{len(df):,} rows')
+
+            # publish the cache entry before any worker starts
+            datasets.read_csv(URL, cache_dir=cache_dir, data_dir=data_dir)
+
+            for shared in (False, True):
+                _, pss_one = run(data_dir, cache_dir, shared, 1, context)
+                private, pss_four = run(data_dir, cache_dir, shared, 4, context)
+
+                label = 'shared' if shared else 'copied'
+                print(f'  {label}  {private / 2**20:7.1f} MB private per worker  '
+                      f'{pss_four / 2**20:7.1f} MB PSS for 4 workers  '
+                      f'{(pss_four - pss_one) / 3 / 2**20:7.1f} MB per extra worker')
+
+
+if __name__ == '__main__':
+    main()
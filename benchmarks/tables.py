@@ -0,0 +1,67 @@
+'''
+HTML table rendering: per-cell iloc lookups vs. utils.tables.table_rows,
+wrapped in an html.Table the way layout/reusable_components.py does.
+
+ * full  - every row of a 10k-row frame
+ * paged - one 100-row page from the middle of 10k- and 1M-row frames
+
+Run with: python -m benchmarks.tables
+'''
+
+import time
+
+import dash_html_components as html
+import numpy as np
+import pandas as pd
+
+from utils.tables import table_rows
+
+
+def iloc_table(dataframe, max_rows=10, page=0):
+    # the cell-by-cell approach generate_table and create_table used to take
+    offset = page * max_rows
+    return html.Table(
+        [html.Tr([html.Th(col) for col in dataframe.columns])] +
+        [html.Tr([
+            html.Td(dataframe.iloc[i][col]) for col in dataframe.columns
+        ]) for i in range(offset, min(len(dataframe), offset + max_rows))]
+    )
+
+
+def tables_table(dataframe, max_rows=10, page=0):
+    # generate_table in layout/reusable_components.py
+    return html.Table(table_rows(dataframe, max_rows, page))
+
+
+def frame(rows, seed=0):
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        'state': rng.choice(['Alabama', 'Alaska', 'Arizona', 'Arkansas'], rows),
+        'total exports': rng.uniform(0, 10000, rows),
+        'beef': rng.uniform(0, 1000, rows),
+        'pork': rng.randint(0, 1000, rows)
+    })
+
+
+def measure(render, *args):
+    start = time.perf_counter()
+    render(*args)
+    return (time.perf_counter() - start) * 1e3
+
+
+def main():
+    for rows in (10**4, 10**6):
+        df = frame(rows)
+        print(f'{rows:>9,} rows')
+
+        if rows <= 10**4:
+            for name, render in (('iloc', iloc_table), ('tables', tables_table)):
+                print(f'    full   {name:<7} {measure(render, df, rows):10.2f} ms')
+
+        page = rows // 200
+        for name, render in (('iloc', iloc_table), ('tables', tables_table)):
+            print(f'    paged  {name:<7} {measure(render, df, 100, page):10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
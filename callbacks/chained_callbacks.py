@@ -1,10 +1,14 @@
 """
 Dash Tutorial Ch. 3 - example 5/5
 
-Example of chaining two Dash callback functions.
+Example of chaining Dash callback functions.
 
 This pattern can be used to create dynamic UIs where one input
 component updates some prooperty of another.
+
+The links are registered as one chain (see utils/chaining.py), so picking
+a country updates the city options, the selected city and the text in a
+single request instead of one round trip per link.
 """
 
 import dash
@@ -12,6 +16,8 @@ import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
 
+from utils.chaining import Chain
+
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
@@ -39,17 +45,27 @@ components = [
 
 app.layout = html.Div(components)
 
+chain = Chain(app)
+
 # this callback dynamically populates the "cities" radio list based on the country selection
-@app.callback(
+@chain.callback(
     Output('cities-radio', 'options'),
     [Input('countries-radio', 'value')]
 )
 def set_cities_options(selected_country):
     return [{'label': i, 'value': i} for i in all_options[selected_country]]
 
+# this callback selects the first city whenever the options change
+@chain.callback(
+    Output('cities-radio', 'value'),
+    [Input('cities-radio', 'options')]
+)
+def set_cities_value(available_options):
+    return available_options[0]['value']
+
 # this callback populates the plaiintext div when a selection is made
 # in either city or country radio lists
-@app.callback(
+@chain.callback(
     Output('display-selected-values', 'children'),
     [Input('countries-radio', 'value'),
     Input('cities-radio', 'value')]
@@ -57,6 +73,7 @@ def set_cities_options(selected_country):
 def set_display_children(selected_country, selected_city):
     return u'{} is a city in {}'.format(selected_city, selected_country)
 
+chain.register()
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -8,26 +8,33 @@ and uses a callback function to update the graph whenever the value of an
 input component is changed.
 '''
 
+import os
+
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
 
-import pandas as pd
+from utils import datasets, deferred, encoding, perf
+from utils.indicators import IndicatorCube
+from utils.response_cache import ResponseCache, SQLiteStore
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
-df = pd.read_csv('https://plotly.github.io/datasets/country_indicators.csv')
+# set DASH_TUTORIALS_PERF=1 to time each callback's phases, served from /_perf
+perf.instrument(app)
 
-available_indicators = df['Indicator Name'].unique()
+deferred.install(app)
 
-x_axis_column_name = dcc.Dropdown(
-    id='xaxis-column',
-    options=[{'label': i, 'value': i} for i in available_indicators],
-    value='Fertility rate, total (births per woman)'
-)
+data_url = 'https://plotly.github.io/datasets/country_indicators.csv'
+
+# loaded at import, on first use or in the background (DASH_TUTORIALS_STARTUP)
+df = deferred.Deferred(lambda: datasets.read_csv(data_url), name='country indicators')
+
+# pivot the long table once so callbacks slice arrays instead of masking rows
+cube = deferred.Deferred(lambda: IndicatorCube(df.get()), name='indicator cube')
 
 x_axis_type = dcc.RadioItems(
     id='xaxis-type',
@@ -36,12 +43,6 @@ x_axis_type = dcc.RadioItems(
     labelStyle={'display': 'inline-block'}
 )
 
-y_axis_column_name = dcc.Dropdown(
-    id='yaxis-column',
-    options=[{'label': i, 'value': i} for i in available_indicators],
-    value='Life expectancy at birth, total (years)'
-)
-
 y_axis_type = dcc.RadioItems(
     id='yaxis-type',
     options=[{'label': i, 'value': i} for i in ['Linear', 'Log']],
@@ -49,40 +50,57 @@ y_axis_type = dcc.RadioItems(
     labelStyle={'display': 'inline-block'}
 )
 
-x_axis_options = [x_axis_column_name, x_axis_type]
-x_div = html.Div(x_axis_options, style={'width': '48%', 'display': 'inline-block'}),
+graph = dcc.Graph(id='indicator-graphic')
 
-y_axis_options = [y_axis_column_name, y_axis_type]
-y_div = html.Div(y_axis_options, style={'width': '48%', 'display': 'inline-block'})
+# the dropdowns and slider list what's in the data, so the layout is built
+# when it's served
+def serve_layout():
+    available_indicators = df.get()['Indicator Name'].unique()
+    years = df.get()['Year']
 
-axis_options = html.Div([x_div, y_div])
+    x_axis_column_name = dcc.Dropdown(
+        id='xaxis-column',
+        options=[{'label': i, 'value': i} for i in available_indicators],
+        value='Fertility rate, total (births per woman)'
+    )
 
-graph = dcc.Graph(id='indicator-graphic')
+    y_axis_column_name = dcc.Dropdown(
+        id='yaxis-column',
+        options=[{'label': i, 'value': i} for i in available_indicators],
+        value='Life expectancy at birth, total (years)'
+    )
 
-slider = dcc.Slider(
-    id='year-slider',
-    min=df['Year'].min(),
-    max=df['Year'].max(),
-    value=df['Year'].max(),
-    marks={str(year): str(year) for year in df['Year'].unique()},
-    step=None
-)
+    slider = dcc.Slider(
+        id='year-slider',
+        min=years.min(),
+        max=years.max(),
+        value=years.max(),
+        marks={str(year): str(year) for year in years.unique()},
+        step=None
+    )
 
-app.layout = html.Div([
-    html.Div([
+    return html.Div([
         html.Div([
-            x_axis_column_name,
-            x_axis_type
-        ], style={'width': '48%', 'display': 'inline-block'}),
-    
-        html.Div([
-            y_axis_column_name,
-            y_axis_type
-        ], style={'width': '48%', 'display': 'inline-block'})
-    ]),
-    graph,
-    slider
-])
+            html.Div([
+                x_axis_column_name,
+                x_axis_type
+            ], style={'width': '48%', 'display': 'inline-block'}),
+
+            html.Div([
+                y_axis_column_name,
+                y_axis_type
+            ], style={'width': '48%', 'display': 'inline-block'})
+        ]),
+        graph,
+        slider
+    ])
+
+deferred.set_layout(app, serve_layout)
+
+def data_version():
+    # the cache records the dataset's content hash once it has been read
+    df.get()
+    return datasets.fingerprint(data_url)
 
 # graph details
 graph_marker={
@@ -91,6 +109,16 @@ graph_marker={
     'line': {'width': 0.5, 'color': 'white'}
 }
 
+# the figure only depends on the inputs, so serve repeat requests from a cache
+# that every worker shares, keyed by the inputs, the dataset version and this
+# file (see utils/response_cache.py), so edits here take effect on restart
+response_cache = ResponseCache(
+    app,
+    SQLiteStore(os.path.join(datasets.CACHE_DIR, 'responses.sqlite')),
+    fingerprint=data_version
+)
+response_cache.memoize(Output('indicator-graphic', 'figure'))
+
 @app.callback(
     Output('indicator-graphic', 'figure'),
     [Input('xaxis-column', 'value'),
@@ -100,12 +128,12 @@ graph_marker={
     Input('year-slider', 'value')]
 )
 def update_graph(x_column_name, y_column_name, x_axis_type, y_axis_type, year):
-    dff = df[df['Year'] == year]
+    countries, x, y = cube.get().scatter(x_column_name, y_column_name, year)
 
     data = [dict(
-        x=dff[dff['Indicator Name'] == x_column_name]['Value'],
-        y=dff[dff['Indicator Name'] == y_column_name]['Value'],
-        text=dff[dff['Indicator Name'] == y_column_name]['Country Name'],
+        x=x,
+        y=y,
+        text=countries,
         mode='markers',
         marker=graph_marker
     )]
@@ -125,10 +153,10 @@ def update_graph(x_column_name, y_column_name, x_axis_type, y_axis_type, year):
     )
 
 
-    return {
+    return encoding.prepare_figure({
         'data': data, 
         'layout': layout
-    }
+    })
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
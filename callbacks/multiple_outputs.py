@@ -5,6 +5,12 @@ Demonstration of using one input variable to drive multiple outputs using callba
 
 Takes a single numeric input input and shows five different math options
 in different table row components.
+
+The powers of x run within a time and output-size budget (see
+utils/budget.py), so a huge x shows "too large" instead of tying up the
+server computing and printing x**x. x**x, which takes longest, has a
+callback and a budget of its own, so the other outputs are still shown when
+it runs out of time.
 '''
 
 import dash
@@ -12,6 +18,8 @@ import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
 
+from utils.budget import budgeted
+
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
@@ -38,12 +46,21 @@ app.layout = html.Div(components)
     [Output('square', 'children'),
     Output('cube', 'children'),
     Output('twos', 'children'),
-    Output('threes', 'children'),
-    Output('x^x', 'children')],
+    Output('threes', 'children')],
     [Input('num-multi', 'value')]
 )
+# an output too large to send shows "too large" on its own
+@budgeted(timeout=1, max_output_bytes=100000, fallback=['too large'] * 4)
 def callback_a(x):
-    return x**2, x**3, 2**x, 3**x, x**x
+    return x**2, x**3, 2**x, 3**x
+
+@app.callback(
+    Output('x^x', 'children'),
+    [Input('num-multi', 'value')]
+)
+@budgeted(timeout=1, max_output_bytes=100000, fallback='too large')
+def callback_b(x):
+    return x**x
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -1,37 +1,57 @@
-w'''
-Ch. 3 - example 2/5
+'''
+Dash Tutorial Ch. 3 - example 2/5
 
 Another example of callbacks, this time using a slider to update a graph.
 '''
 
+import os
+
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
 
-import pandas as pd
+from utils import datasets, deferred, encoding
+from utils.response_cache import MemoryStore, ResponseCache
+
+data_url = 'https://raw.githubusercontent.com/plotly/datasets/master/gapminderDataFiveYear.csv'
 
-df = pd.read_csv('https://raw.githubusercontent.com/plotly/datasets/master/gapminderDataFiveYear.csv')
+# loaded at import, on first use or in the background (DASH_TUTORIALS_STARTUP)
+df = deferred.Deferred(lambda: datasets.read_csv(data_url), name='gapminder')
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
+deferred.install(app)
+
+# find each year's rows once, rather than filtering on every slider move
+# (as positions, so that a shared dataset isn't copied into this process)
+rows_by_year = deferred.Deferred(
+    lambda: df.get().groupby('year').indices,
+    name='gapminder rows by year'
+)
 
 # create graph and slider components
 graph = dcc.Graph(id='graph-with-slider')
 
-slider = dcc.Slider(
-    id='year-slider',
-    min=df['year'].min(),
-    max=df['year'].max(),
-    value=df['year'].min(),
-    marks={str(year): str(year) for year in df['year'].unique()},
-    step=None
-)
+# the slider's marks come from the data, so the layout is built when it's served
+def serve_layout():
+    years = df.get()['year']
+
+    slider = dcc.Slider(
+        id='year-slider',
+        min=years.min(),
+        max=years.max(),
+        value=years.min(),
+        marks={str(year): str(year) for year in years.unique()},
+        step=None
+    )
+
+    # put components into app layout
+    components = [graph, slider]
+    return html.Div(components)
 
-# put components into app layout
-components = [graph, slider]
-app.layout = html.Div(components)
+deferred.set_layout(app, serve_layout)
 
 # set up markers and a layout for the graph
 marker = {
@@ -54,11 +74,10 @@ graph_layout = dict(
     Output('graph-with-slider', 'figure'),
     [Input('year-slider', 'value')])
 def update_figure(selected_year):
-    # use the slider value to slice the data
-    filtered_df = df[df.year == selected_year]
+    # use the slider value to slice the data, then split it by continent in one pass
+    filtered_df = df.get().take(rows_by_year.get()[selected_year])
     traces = []
-    for c in filtered_df.continent.unique():
-        df_by_continent = filtered_df[filtered_df.continent == c]
+    for c, df_by_continent in filtered_df.groupby('continent', sort=False, observed=True):
         traces.append(dict(
             x=df_by_continent.gdpPercap,
             y=df_by_continent.lifeExp,
@@ -69,11 +88,25 @@ def update_figure(selected_year):
             name=c
         ))
     
-    return {
+    return encoding.prepare_figure({
         'data': traces,
         'layout': graph_layout
-    }
+    })
+
+# optional precompute mode - there are only a dozen years, so the encoded
+# response for each one can be kept in memory:
+#  * DASH_TUTORIALS_PRERENDER=lazy caches each year's figure on first use
+#  * DASH_TUTORIALS_PRERENDER=startup renders every year before serving
+prerender = os.environ.get('DASH_TUTORIALS_PRERENDER')
+if prerender in ('lazy', 'startup'):
+    response_cache = ResponseCache(app, MemoryStore())
+    response_cache.memoize(Output('graph-with-slider', 'figure'))
+
+    if prerender == 'startup':
+        response_cache.prerender(
+            Output('graph-with-slider', 'figure'),
+            [(int(year),) for year in rows_by_year.get()]
+        )
 
 if __name__ == '__main__':
-    print({str(year): year for year in df.year.unique()})
     app.run_server(debug=True)
\ No newline at end of file
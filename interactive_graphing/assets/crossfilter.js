@@ -0,0 +1,43 @@
+/*
+ * Clientside half of the incremental crossfilter updates in
+ * generic_crossfilter.py: merges the patch the server sent for a graph into
+ * the figure it is already showing.
+ *
+ * A patch is either {figure: ...} to replace the figure outright, or any of
+ * {data: [...]}, {selectedpoints: [...]} and {shapes: [...]}.
+ *
+ * selectionRange keeps only the bounds of a rectangle selection, so the
+ * server resolves the selected rows itself instead of receiving every point.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    crossfilter: {
+        selectionRange: function(selectedData) {
+            if (!selectedData || !selectedData.range) {
+                return null;
+            }
+            return {range: selectedData.range};
+        },
+
+        applyPatch: function(patch, figure) {
+            if (!patch) {
+                return figure;
+            }
+            if (patch.figure || !figure) {
+                return patch.figure;
+            }
+
+            // new objects all the way down to what changed, so the graph re-renders
+            var data = patch.data ? patch.data : figure.data.slice();
+            if (patch.selectedpoints) {
+                data[0] = Object.assign({}, data[0], {selectedpoints: patch.selectedpoints});
+            }
+
+            var layout = figure.layout;
+            if (patch.shapes) {
+                layout = Object.assign({}, layout, {shapes: patch.shapes});
+            }
+
+            return Object.assign({}, figure, {data: data, layout: layout});
+        }
+    }
+});
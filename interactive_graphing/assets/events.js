@@ -0,0 +1,122 @@
+/*
+ * Browser half of utils/events.py.
+ *
+ * Finds graphs wrapped by EventChannel.container() (a div with a data-events
+ * URL), listens to their plotly interaction events, and posts them to the
+ * server in one batch per animation frame. Only one batch per graph is in
+ * flight at a time; events that arrive meanwhile go out in the next batch.
+ * The response maps element ids to their new text.
+ *
+ * A double click that clears a selection fires plotly_deselect, which is
+ * sent as selectedData with no data, like dcc.Graph does.
+ */
+(function() {
+    var PLOTLY_EVENTS = {
+        plotly_hover: 'hoverData',
+        plotly_click: 'clickData',
+        plotly_selected: 'selectedData',
+        plotly_deselect: 'selectedData',
+        plotly_relayout: 'relayoutData'
+    };
+
+    // plotly event data references whole traces, so keep only plain point fields
+    function cleanPoints(data) {
+        if (!data || !data.points) {
+            return data;
+        }
+        var clean = {points: data.points.map(function(p) {
+            return {
+                curveNumber: p.curveNumber,
+                pointNumber: p.pointNumber,
+                pointIndex: p.pointIndex,
+                x: p.x,
+                y: p.y,
+                text: p.text,
+                customdata: p.customdata
+            };
+        })};
+        if (data.range) {
+            clean.range = data.range;
+        }
+        if (data.lassoPoints) {
+            clean.lassoPoints = data.lassoPoints;
+        }
+        return clean;
+    }
+
+    function attach(container) {
+        var gd = container.querySelector('.js-plotly-plot');
+        if (!gd || !gd.on || gd._eventChannel) {
+            return;
+        }
+
+        var channel = gd._eventChannel = {queue: [], scheduled: false, inFlight: false};
+        var url = container.getAttribute('data-events');
+
+        function flush() {
+            channel.scheduled = false;
+            if (channel.inFlight || !channel.queue.length) {
+                return;
+            }
+
+            var events = channel.queue;
+            channel.queue = [];
+            channel.inFlight = true;
+
+            fetch(url, {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({events: events})
+            }).then(function(response) {
+                return response.json();
+            }).then(function(body) {
+                Object.keys(body.updates).forEach(function(id) {
+                    var el = document.getElementById(id);
+                    if (el) {
+                        el.textContent = body.updates[id];
+                    }
+                });
+            }).finally(function() {
+                channel.inFlight = false;
+                schedule();
+            });
+        }
+
+        function schedule() {
+            if (!channel.scheduled && channel.queue.length) {
+                channel.scheduled = true;
+                window.requestAnimationFrame(flush);
+            }
+        }
+
+        Object.keys(PLOTLY_EVENTS).forEach(function(name) {
+            gd.on(name, function(data) {
+                var type = PLOTLY_EVENTS[name];
+                if (name === 'plotly_deselect') {
+                    data = null;
+                } else if (type !== 'relayoutData') {
+                    data = cleanPoints(data);
+                }
+                channel.queue.push({type: type, data: data});
+                schedule();
+            });
+        });
+    }
+
+    // graphs are rendered by React after page load, and plotted after that, so
+    // look for new ones whenever the page changes; attach() skips graphs that
+    // already have a channel or haven't been plotted yet
+    var pending = false;
+    function scan() {
+        pending = false;
+        document.querySelectorAll('[data-events]').forEach(attach);
+    }
+
+    new MutationObserver(function() {
+        if (!pending) {
+            pending = true;
+            window.requestAnimationFrame(scan);
+        }
+    }).observe(document.documentElement, {childList: true, subtree: true});
+    scan();
+})();
@@ -7,6 +7,8 @@ This app produces three scatter plots and, through a callback, will propagate
 a selection on one chart to the other two.
 """
 
+import hashlib
+import os
 from pprint import pprint
 
 import dash
@@ -14,15 +16,30 @@ import dash_core_components as dcc
 import dash_html_components as html
 import numpy as np
 import pandas as pd
-from dash.dependencies import Input, Output
+from dash.dependencies import ClientsideFunction, Input, Output, State
+from dash.exceptions import PreventUpdate
+
+from utils import aggregation, encoding
+from utils.selection import SelectionEngine, SortedIndex, rectangle, selected_range
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
 # create a six-column dataset to plot across three scatter charts
+# (set DASH_TUTORIALS_CROSSFILTER_ROWS to try it with a much larger frame)
+n_rows = int(os.environ.get('DASH_TUTORIALS_CROSSFILTER_ROWS', 30))
 np.random.seed(0)
-df = pd.DataFrame({f"Col {i+1}" : np.random.rand(30) for i in range(6)})
+df = pd.DataFrame({f"Col {i+1}" : np.random.rand(n_rows) for i in range(6)})
+
+# above this many visible points, graphs show a density grid instead of markers
+max_points = 5000
+
+# combines the selections from each graph with vectorized boolean masks
+selection_engine = SelectionEngine(len(df))
+
+# sorted column indexes resolve zooms and rectangle selections without a full scan
+indexes = {col: SortedIndex(df[col]) for col in df.columns}
 
 
 graph_config = {'displayModeBar': False}
@@ -36,14 +53,40 @@ graphs = (g1, g2, g3)
 
 components = [html.Div(g, className='four columns') for g in graphs]
 
-app.layout = html.Div(components)
+# the server sends each graph a patch, which a clientside callback applies to its figure
+patches = [dcc.Store(id=f'{g.id}-patch') for g in graphs]
+selection_digest = dcc.Store(id='selection-digest')
+
+# only the bounds of each graph's selection are sent to the server, not its points
+ranges = [dcc.Store(id=f'{g.id}-range') for g in graphs]
+
+# the axis ranges each graph is zoomed to; relayoutData only has the latest event
+views = [dcc.Store(id=f'{g.id}-view') for g in graphs]
 
-def get_figure(df, x_col, y_col, selected_points, local_selection):
+app.layout = html.Div(components + patches + ranges + views + [selection_digest])
+
+columns = [("Col 1", "Col 2"), ("Col 3", "Col 4"), ("Col 5", "Col 6")]
+
+def get_view(df, x_col, y_col, view):
     """
-    Updates selections in a scatter plot based on an input selection
-    and the current state of selected data in the plot.
+    Returns the axis ranges a graph is zoomed to, and the rows visible in it
+    (None when it isn't zoomed and shows every row).
+    """
+    x_range, y_range = (view['x'], view['y']) if view else (None, None)
+    if x_range is None and y_range is None:
+        return x_range, y_range, None
+    return x_range, y_range, rectangle(indexes[x_col], indexes[y_col], x_range, y_range)
+
+def trace_positions(rows, selected_points):
+    """
+    Returns the positions within a trace of `rows` of the selected rows.
+    """
+    return np.flatnonzero(np.isin(rows, selected_points))
+
+def get_shapes(df, x_col, y_col, local_selection):
+    """
+    Returns a dotted rectangle covering the graph's own selection.
     """
-    
     # if there is a local selection, find its bounds so we can persist a rectangle
     if local_selection and local_selection['range']:
         pprint(f'local_selection: {local_selection}')
@@ -55,17 +98,46 @@ def get_figure(df, x_col, y_col, selected_points, local_selection):
     # otherwise set the bounds as the whole chart area
     else:
         selection_bounds = {
-            'x0': np.min(df[x_col]), 'x1': np.max(df[x_col]),
-            'y0': np.min(df[y_col]), 'y1': np.max(df[y_col])
+            'x0': indexes[x_col].min(), 'x1': indexes[x_col].max(),
+            'y0': indexes[y_col].min(), 'y1': indexes[y_col].max()
         }
 
-    data = [dict(
-        x=df[x_col],
-        y=df[y_col],
-        text=df.index,
+    return [dict({
+        'type': 'rect',
+        'line': { 'width': 1, 'dash': 'dot', 'color': 'darkgrey' }
+    }, **selection_bounds
+    )]
+
+def is_aggregated(df, rows):
+    return (len(df) if rows is None else len(rows)) > max_points
+
+def get_data(df, x_col, y_col, selected_points, x_range, y_range, rows):
+    """
+    Returns the traces for the visible `rows`: markers, or density grids when
+    there are more than `max_points` of them.
+    """
+    x, y = df[x_col].to_numpy(), df[y_col].to_numpy()
+
+    if is_aggregated(df, rows):
+        # too many points to send - show where all points are, and the selected ones on top
+        return [
+            aggregation.density_trace(x, y, x_range, y_range, colorscale='Greys', opacity=0.4),
+            aggregation.density_trace(
+                x[selected_points], y[selected_points], x_range, y_range, colorscale='Blues'
+            )
+        ]
+
+    if rows is None:
+        rows = np.arange(len(df))
+
+    return [dict(
+        x=x[rows],
+        y=y[rows],
+        text=rows,
         textposition='top',
-        selectedpoints=selected_points,
-        customdata=df.index,
+        # selectedpoints are positions within this trace, not row labels
+        selectedpoints=trace_positions(rows, selected_points),
+        customdata=df.index[rows],
         type='scatter',
         mode='markers+text',
         marker={'color': 'rgba(0, 116, 217, 0.7)', 'size': 12},
@@ -75,49 +147,139 @@ def get_figure(df, x_col, y_col, selected_points, local_selection):
         }
     )]
 
+def get_figure(df, x_col, y_col, selected_points, local_selection, view=None):
+    """
+    Updates selections in a scatter plot based on an input selection
+    and the current state of selected data in the plot.
+
+    When more than `max_points` points are visible, the points are binned
+    into a density grid over the current (possibly zoomed) axis ranges.
+    """
+    x_range, y_range, rows = get_view(df, x_col, y_col, view)
+
     layout = {
+        'xaxis': {'range': x_range} if x_range else {},
+        'yaxis': {'range': y_range} if y_range else {},
         'margin': {'l': 20, 'r': 0, 'b': 15, 't': 5},
         'dragmode': 'select',
         'hovermode': False,
         # Display a rectangle to cover the selection bounds
-        'shapes': [dict({
-            'type': 'rect',
-            'line': { 'width': 1, 'dash': 'dot', 'color': 'darkgrey' }
-        }, **selection_bounds
-        )]
+        'shapes': get_shapes(df, x_col, y_col, local_selection)
     }
 
-    return {
-        'data': data,
+    return encoding.prepare_figure({
+        'data': get_data(df, x_col, y_col, selected_points, x_range, y_range, rows),
         'layout': layout
-    }
+    })
+
+def get_patch(df, x_col, y_col, selected_points, local_selection, view,
+              selection_changed, shapes_changed):
+    """
+    Returns only the parts of a graph's figure that changed, or no_update.
+
+    Marker graphs just get new selectedpoints; density graphs get new traces.
+    """
+    patch = {}
+
+    if selection_changed:
+        x_range, y_range, rows = get_view(df, x_col, y_col, view)
+        if is_aggregated(df, rows):
+            data = get_data(df, x_col, y_col, selected_points, x_range, y_range, rows)
+            patch['data'] = encoding.prepare_figure({'data': data})['data']
+        elif rows is None:
+            patch['selectedpoints'] = selected_points
+        else:
+            patch['selectedpoints'] = trace_positions(rows, selected_points)
+
+    if shapes_changed:
+        patch['shapes'] = get_shapes(df, x_col, y_col, local_selection)
+
+    return patch or dash.no_update
+
+for g in graphs:
+    @app.callback(
+        Output(f'{g.id}-view', 'data'),
+        [Input(g.id, 'relayoutData')],
+        [State(f'{g.id}-view', 'data')]
+    )
+    def update_view(relayout_data, view):
+        """
+        Keeps track of the graph's axis ranges, ignoring relayout events
+        that don't change them.
+        """
+        new_view = aggregation.update_view(view, relayout_data)
+        if new_view is None or new_view == view:
+            raise PreventUpdate
+        return new_view
 
 @app.callback(
-    [Output(g.id, 'figure') for g in graphs],
-    [Input(g.id, 'selectedData') for g in graphs]
+    [Output(f'{g.id}-patch', 'data') for g in graphs] + [Output('selection-digest', 'data')],
+    [Input(f'{g.id}-range', 'data') for g in graphs] +
+    [Input(f'{g.id}-view', 'data') for g in graphs],
+    [State('selection-digest', 'data')]
 )
-def callback(selection1, selection2, selection3):
+def callback(selection1, selection2, selection3, view1, view2, view3, previous_digest):
     """
-    Update all three graphs whenever the selected points on any graph changes.
+    Update all three graphs whenever the selected points on any graph changes,
+    or when a graph is zoomed.
 
     Takes the local selection from the graph that was changed, finds all points
-    contained within it, and calls get_figure() to update the other graphs to 
-    reflect the same selection.
+    contained within its range using the sorted column indexes, and sends
+    each graph only what changed: the new
+    selected points to every graph, and the selection rectangle to the graph
+    that was changed. Graphs are re-sent in full on the first call and when
+    zoomed, since that changes which points they show.
     """
-    
-    selected_points = df.index
-
-    for selected_data in [selection1, selection2, selection3]:
-        if selected_data and selected_data.get('points'):
-            # if there are points selected in any graph, 
-            selected_points = np.intersect1d(
-                selected_points, 
-                [p.get('customdata') for p in selected_data.get('points')]
-            )
-    
-    return [get_figure(df, "Col 1", "Col 2", selected_points, selection1),
-            get_figure(df, "Col 3", "Col 4", selected_points, selection2),
-            get_figure(df, "Col 5", "Col 6", selected_points, selection3)]
+    triggered = {t['prop_id'] for t in dash.callback_context.triggered}
+    selections = [selection1, selection2, selection3]
+    views = [view1, view2, view3]
+
+    # resolve each graph's rectangle to rows, and keep those selected on every
+    # graph; rectangles that haven't changed reuse their cached masks
+    keyed = []
+    for (x_col, y_col), selection in zip(columns, selections):
+        bounds = selected_range(selection)
+        if bounds is None:
+            keyed.append((None, None))
+            continue
+        key = (tuple(bounds['x']), tuple(bounds['y']))
+        keyed.append((key, lambda x_col=x_col, y_col=y_col, bounds=bounds: rectangle(
+            indexes[x_col], indexes[y_col], bounds['x'], bounds['y']
+        )))
+    selected_points = selection_engine.select_keyed(keyed)
+
+    # a digest of the selection tells us whether the other graphs need updating
+    digest = hashlib.sha1(selected_points.tobytes()).hexdigest()
+
+    patches = []
+    for g, (x_col, y_col), selection, view in zip(graphs, columns, selections, views):
+        if previous_digest is None or f'{g.id}-view.data' in triggered:
+            figure = get_figure(df, x_col, y_col, selected_points, selection, view)
+            patches.append({'figure': figure})
+        else:
+            patches.append(get_patch(
+                df, x_col, y_col, selected_points, selection, view,
+                selection_changed=digest != previous_digest,
+                shapes_changed=f'{g.id}-range.data' in triggered
+            ))
+
+    return patches + [digest if digest != previous_digest else dash.no_update]
+
+# apply each patch to its graph's figure in the browser, and strip the selected
+# points from each selection before it is sent to the server
+for g in graphs:
+    app.clientside_callback(
+        ClientsideFunction(namespace='crossfilter', function_name='selectionRange'),
+        Output(f'{g.id}-range', 'data'),
+        [Input(g.id, 'selectedData')]
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace='crossfilter', function_name='applyPatch'),
+        Output(g.id, 'figure'),
+        [Input(f'{g.id}-patch', 'data')],
+        [State(g.id, 'figure')]
+    )
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -14,12 +14,16 @@ from textwrap import dedent as d
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output
+
+from utils.events import EventChannel, KeepAliveRequestHandler
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
+# all of the graph's interaction events share one batched channel to the server
+channel = EventChannel(app, 'basic-interactions')
+
 styles = {
     'pre': {
         'border': 'thin lightgrey solid',
@@ -110,7 +114,7 @@ text_row = html.Div(
     children=[hover_text, click_text, selection_text, relayout_text]
 )
 
-components = [graph, text_row]
+components = [channel.container(graph), text_row]
 
 app.layout = html.Div(components)
 
@@ -122,41 +126,32 @@ When supported interactions happen, attributes on the graph are updated automati
  * Selections update the selectedData attribute
  * Zooms or relayouots update the relayoutData attribute
 
-These callback functions will pass upadated attribute values
-to the text components underneath the graph.
+These handlers will pass upadated attribute values
+to the text components underneath the graph. Rather than one callback per
+attribute, they are registered on an EventChannel: the browser sends every
+event from the graph in one batch per animation frame, and the server runs
+the handler for each event type and returns the new text for each component.
 """
 
 # updates the hover-data component with the value of the graph's hoverData attribute
-@app.callback(
-    Output('hover-data', 'children'),
-    [Input('basic-interactions', 'hoverData')]
-)
+@channel.on('hoverData', 'hover-data')
 def display_hover_data(hover_data):
     return json.dumps(hover_data, indent=2)
 
 # updates the click-data component with the value of the graph's clickData attribute
-@app.callback(
-    Output('click-data', 'children'),
-    [Input('basic-interactions', 'clickData')]
-)
+@channel.on('clickData', 'click-data')
 def display_click_data(click_data):
     return json.dumps(click_data, indent=2)
 
 # updates the selected-data component with the value of the graph's selectedData attribute
-@app.callback(
-    Output('selected-data', 'children'),
-    [Input('basic-interactions', 'selectedData')]
-)
+@channel.on('selectedData', 'selected-data')
 def display_selected_data(selected_data):
     return json.dumps(selected_data, indent=2)
 
 # updates the relayout-data component with the value of the graph's selectedData attribute
-@app.callback(
-    Output('relayout-data', 'children'),
-    [Input('basic-interactions', 'relayoutData')]
-)
+@channel.on('relayoutData', 'relayout-data')
 def display_relayout_data(relayout_data):
     return json.dumps(relayout_data, indent=2)
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app.run_server(debug=True, request_handler=KeepAliveRequestHandler)
\ No newline at end of file
@@ -15,23 +15,35 @@ import dash
 from dash.dependencies import Input, Output
 import dash_core_components as dcc
 import dash_html_components as html
-import pandas as pd
+
+from utils import datasets, deferred, encoding, perf
+from utils.coalesce import Coalescer
+from utils.indicators import IndicatorCube, SeriesIndex
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
-df = pd.read_csv('https://plotly.github.io/datasets/country_indicators.csv')
+# set DASH_TUTORIALS_PERF=1 to time each callback's phases, served from /_perf
+perf.instrument(app)
+
+# hover fires faster than the time series can be rebuilt - only answer the latest
+coalescer = Coalescer(app)
 
-available_indicators = df['Indicator Name'].unique()
+deferred.install(app)
 
-# crossfilter selectors
-x_axis_column = dcc.Dropdown(
-    id='crossfilter-xaxis-column',
-    options=[{'label': i, 'value': i} for i in available_indicators],
-    value='Fertility rate, total (births per woman)'
+# loaded at import, on first use or in the background (DASH_TUTORIALS_STARTUP)
+df = deferred.Deferred(
+    lambda: datasets.read_csv('https://plotly.github.io/datasets/country_indicators.csv'),
+    name='country indicators'
 )
 
+# pivot the long table once so callbacks slice arrays instead of masking rows
+cube = deferred.Deferred(lambda: IndicatorCube(df.get()), name='indicator cube')
+
+# hover is the most frequent event, so each time series is a precomputed slice
+series_index = deferred.Deferred(lambda: SeriesIndex(df.get()), name='series index')
+
 x_axis_type = dcc.RadioItems(
     id='crossfilter-xaxis-type',
     options=[{'label': i, 'value': i} for i in ['Linear', 'Log']],
@@ -39,12 +51,6 @@ x_axis_type = dcc.RadioItems(
     labelStyle={'display': 'inline-block'}
 )
 
-y_axis_column = dcc.Dropdown(
-    id='crossfilter-yaxis-column',
-    options=[{'label': i, 'value': i} for i in available_indicators],
-    value='Life expectancy at birth, total (years)'
-)
-
 y_axis_type = dcc.RadioItems(
     id='crossfilter-yaxis-type',
     options=[{'label': i, 'value': i} for i in ['Linear', 'Log']],
@@ -59,12 +65,6 @@ container_style = {
     'padding': '10px 5px'
 }
 
-crossfilter_div = html.Div([
-    html.Div([x_axis_column, x_axis_type], style=crossfilter_style),
-    html.Div([y_axis_column, y_axis_type], style=crossfilter_style)
-], style=container_style)
-
-
 # scatter plot
 scatter = dcc.Graph(
     id='crossfilter-indicator-scatter',
@@ -84,22 +84,48 @@ ts_style = crossfilter_style
 
 ts_div = html.Div([x_time_series, y_time_series], style=ts_style)
 
-# year slider
-slider = dcc.Slider(
-    id='crossfilter-year-slider',
-    min=df['Year'].min(),
-    max=df['Year'].max(),
-    value=df['Year'].max(),
-    marks={str(year): str(year) for year in df['Year'].unique()},
-    step=None
-)
-
 slider_style = {'width': '49%', 'padding': '0px 20px 20px 20px'}
 
-slider_div = html.Div(slider, style=slider_style)
+# the selectors and slider list what's in the data, so the layout is built
+# when it's served
+def serve_layout():
+    available_indicators = df.get()['Indicator Name'].unique()
+    years = df.get()['Year']
+
+    # crossfilter selectors
+    x_axis_column = dcc.Dropdown(
+        id='crossfilter-xaxis-column',
+        options=[{'label': i, 'value': i} for i in available_indicators],
+        value='Fertility rate, total (births per woman)'
+    )
+
+    y_axis_column = dcc.Dropdown(
+        id='crossfilter-yaxis-column',
+        options=[{'label': i, 'value': i} for i in available_indicators],
+        value='Life expectancy at birth, total (years)'
+    )
+
+    crossfilter_div = html.Div([
+        html.Div([x_axis_column, x_axis_type], style=crossfilter_style),
+        html.Div([y_axis_column, y_axis_type], style=crossfilter_style)
+    ], style=container_style)
+
+    # year slider
+    slider = dcc.Slider(
+        id='crossfilter-year-slider',
+        min=years.min(),
+        max=years.max(),
+        value=years.max(),
+        marks={str(year): str(year) for year in years.unique()},
+        step=None
+    )
 
-components = [crossfilter_div, scatter_div, ts_div, slider_div]
-app.layout = html.Div(components)
+    slider_div = html.Div(slider, style=slider_style)
+
+    components = [crossfilter_div, scatter_div, ts_div, slider_div]
+    return html.Div(components)
+
+deferred.set_layout(app, serve_layout)
 
 inputs = ['crossfilter-xaxis-column', 
     'crossfilter-yaxis-column', 
@@ -119,13 +145,13 @@ marker = {
     [Input(i, 'value') for i in inputs]
 )
 def update_graph(x_axis_name, y_axis_name, x_axis_type, y_axis_type, year):
-    dff = df[df['Year']==year]
+    countries, x, y = cube.get().scatter(x_axis_name, y_axis_name, year)
 
     data = [dict(
-        x=dff[dff['Indicator Name']==x_axis_name].Value,
-        y=dff[dff['Indicator Name']==y_axis_name].Value,
-        text=dff[dff['Indicator Name']==x_axis_name]['Country Name'],
-        customdata=dff[dff['Indicator Name']==y_axis_name]['Country Name'],
+        x=x,
+        y=y,
+        text=countries,
+        customdata=countries,
         mode='markers',
         marker=marker
     )]
@@ -145,17 +171,17 @@ def update_graph(x_axis_name, y_axis_name, x_axis_type, y_axis_type, year):
         transition={'duration': 500}
     )
 
-    return {
+    return encoding.prepare_figure({
         'data': data,
         'layout': layout
-    }
+    })
 
 # encapsulate logic to update both x- and y-axis time series
-def create_time_series(dff, axis_type, title):
+def create_time_series(years, values, axis_type, title):
     
     data = [{
-        'x': dff['Year'],
-        'y': dff['Value'],
+        'x': years,
+        'y': values,
         'mode': 'lines+markers'
     }]
     
@@ -172,10 +198,10 @@ def create_time_series(dff, axis_type, title):
         'xaxis': {'showgrid': False}
     }
 
-    return {
+    return encoding.prepare_figure({
         'data': data,
         'layout': layout
-    }
+    })
 
 # update the x-axis time series on hover in the main graph
 @app.callback(
@@ -184,12 +210,12 @@ def create_time_series(dff, axis_type, title):
     Input('crossfilter-xaxis-column', 'value'),
     Input('crossfilter-xaxis-type', 'value')]
 )
+@coalescer.coalesce('x-time-series')
 def update_x_timeseries(hoverData, axis_name, axis_type):
     country_name = hoverData['points'][0]['customdata']
-    dff = df[df['Country Name'] == country_name]
-    dff = dff[dff['Indicator Name'] == axis_name]
+    years, values = series_index.get().series(country_name, axis_name)
     title = f'<b>{country_name}</b><br>{axis_name}'
-    return create_time_series(dff, axis_type, title)
+    return create_time_series(years, values, axis_type, title)
 
 # update the y-axis time series on hover in the main graph
 @app.callback(
@@ -198,12 +224,12 @@ def update_x_timeseries(hoverData, axis_name, axis_type):
     Input('crossfilter-yaxis-column', 'value'),
     Input('crossfilter-yaxis-column', 'value')]
 )
+@coalescer.coalesce('y-time-series')
 def update_y_timeseries(hoverData, axis_name, axis_type):
     country_name = hoverData['points'][0]['customdata']
-    dff = df[df['Country Name']==country_name]
-    dff = dff[dff['Indicator Name'] == axis_name]
+    years, values = series_index.get().series(country_name, axis_name)
     title = f'<b>{country_name}</b><br>{axis_name}'
-    return create_time_series(dff, axis_type, title)
+    return create_time_series(years, values, axis_type, title)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -5,28 +5,33 @@ Small example of driving content through Markdown.
 
 For larger blocks of text, we might prefer to write in Markdown instead. 
 
-This example shows how to use Markdown content from a separate file 
-by using the dcc.Markdown component.
+This example shows how to use Markdown content from a separate file.
+Rather than sending the Markdown to the browser for dcc.Markdown to render
+on every page load, the file is rendered to HTML once on the server (see
+utils/markdown_content.py), re-rendered when it is edited, and shown in an
+Iframe.
 '''
 
-import markdown
+import os
 
 import dash
-import dash_core_components as dcc
 import dash_html_components as html
 
+from utils.markdown_content import MarkdownContent
+
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
-# read markdown from a separate file
-text = open('text.md').read()
+# serve markdown from a separate file, next to this one
+content = MarkdownContent(app, stylesheets=external_stylesheets)
+content.register('text', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'text.md'))
 
-# plug markdown into a Div
+# plug the rendered markdown into a Div
 app.layout = html.Div([
-    dcc.Markdown(children=text)
+    html.Iframe(src=content.url('text'), style={'border': 'none', 'width': '100%', 'height': '400px'})
 ])
 
 if __name__ == '__main__':
-    print('this example renders text from a markdown file in the browser')
-    app.run_server(debug=True)
\ No newline at end of file
+    print('this example renders text from a markdown file on the server')
+    app.run_server(debug=True)
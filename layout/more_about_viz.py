@@ -9,14 +9,20 @@ Demonstrates how to work with the primary dcc component, a Graph.
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-import pandas as pd
+
+from utils import datasets, deferred
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
+deferred.install(app)
 
 # read dummy data from example
-df = pd.read_csv('https://gist.githubusercontent.com/chriddyp/5d1ea79569ed194d432e56108a04d188/raw/a9f9e8076b837d541398e999dcbac2b2826a81f8/gdp-life-exp-2007.csv')
+# (loaded at import, on first use or in the background - DASH_TUTORIALS_STARTUP)
+df = deferred.Deferred(
+    lambda: datasets.read_csv('https://gist.githubusercontent.com/chriddyp/5d1ea79569ed194d432e56108a04d188/raw/a9f9e8076b837d541398e999dcbac2b2826a81f8/gdp-life-exp-2007.csv'),
+    name='gdp-life-exp-2007'
+)
 
 # get the data into a structure for plotly to take care of
 marker = {
@@ -26,15 +32,16 @@ marker = {
     }
 }
 
-data = [{
-    'x': df[df['continent'] == i]['gdp per capita'],
-    'y': df[df['continent'] == i]['life expectancy'],
-    'text': df[df['continent']==i].country,
-    'mode': 'markers',
-    'opacity': 0.7,
-    'marker': marker,
-    'name': i
-} for i in df.continent.unique()]
+def create_data(df):
+    return [{
+        'x': df[df['continent'] == i]['gdp per capita'],
+        'y': df[df['continent'] == i]['life expectancy'],
+        'text': df[df['continent']==i].country,
+        'mode': 'markers',
+        'opacity': 0.7,
+        'marker': marker,
+        'name': i
+    } for i in df.continent.unique()]
 
 # proviide a
 layout = {
@@ -56,21 +63,25 @@ layout = {
 }
 
 # the "figure" argument that dcc.Graph exposes is the same "figure" arg in plotly
-# create one here by supplying the data & layout from above
-fig = {
-    'data': data,
-    'layout': layout
-}
+# create one here by supplying the data & layout from above; the data is only
+# needed once the page is served
+def serve_layout():
+    fig = {
+        'data': create_data(df.get()),
+        'layout': layout
+    }
+
+    # feed the figure into a dcc.Graph housed inside a Div
+    return html.Div([
+        dcc.Graph(
+            id='life-exp-vs-gdp',
+            figure=fig
+        )
+    ])
 
-# feed the figure into a dcc.Graph housed inside a Div
-app.layout = html.Div([
-    dcc.Graph(
-        id='life-exp-vs-gdp',
-        figure=fig
-    )
-])
+deferred.set_layout(app, serve_layout)
 
 if __name__ == '__main__':
     print('this example prints a scatter plot of life expentency by GDP')
-    print(df.head())
+    print(df.get().head())
     app.run_server(debug=True)
\ No newline at end of file
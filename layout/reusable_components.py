@@ -4,35 +4,68 @@ Dash Tutorial Ch. 2 - example 3/6
 Demonstration of using Python functons to encapsulate repetitive markup.
 '''
 
-
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-import pandas as pd
+from dash.dependencies import Input, Output
 
-df = pd.read_csv('https://gist.githubusercontent.com/chriddyp/c78bf172206ce24f77d6363a2d754b59/raw/c353e8ef842413cae56ae3920b8fd78468aa4cb2/usa-agricultural-exports-2011.csv')
+from utils import datasets, deferred
+from utils.tables import page_count, table_rows
 
+# loaded at import, on first use or in the background (DASH_TUTORIALS_STARTUP)
+df = deferred.Deferred(
+    lambda: datasets.read_csv('https://gist.githubusercontent.com/chriddyp/c78bf172206ce24f77d6363a2d754b59/raw/c353e8ef842413cae56ae3920b8fd78468aa4cb2/usa-agricultural-exports-2011.csv'),
+    name='usa-agricultural-exports-2011'
+)
 
-def generate_table(dataframe, max_rows=10):
-    return html.Table(
-        # Header
-        [html.Tr([html.Th(col) for col in dataframe.columns])] +
 
-        # Body
-        [html.Tr([
-            html.Td(dataframe.iloc[i][col]) for col in dataframe.columns
-        ]) for i in range(min(len(dataframe), max_rows))]
-    )
+def generate_table(dataframe, max_rows=10, page=0):
+    # the header and one page of rows, built from whole columns rather than
+    # one iloc lookup per cell (see utils/tables.py)
+    return html.Table(table_rows(dataframe, max_rows, page))
 
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
+deferred.install(app)
+
+page_size = 10
+
+# the number of pages and the first page come from the data, so the layout is
+# built when it's served
+def serve_layout():
+    # only one page of rows is rendered at a time
+    page_input = dcc.Input(
+        id='table-page',
+        type='number',
+        min=0,
+        max=page_count(df.get(), page_size) - 1,
+        step=1,
+        value=0
+    )
+
+    return html.Div(children=[
+        html.H4(children='US Agriculture Exports (2011)'),
+        html.Label(['Page ', page_input]),
+        html.Div(generate_table(df.get(), max_rows=page_size), id='table')
+    ])
+
+deferred.set_layout(app, serve_layout)
+
+@app.callback(
+    Output('table', 'children'),
+    [Input('table-page', 'value')]
+)
+def update_table(page):
+    # the input can be cleared, or typed past its bounds
+    try:
+        page = int(page or 0)
+    except (TypeError, ValueError):
+        page = 0
+    page = min(max(page, 0), page_count(df.get(), page_size) - 1)
 
-app.layout = html.Div(children=[
-    html.H4(children='US Agriculture Exports (2011)'),
-    generate_table(df)
-])
+    return generate_table(df.get(), max_rows=page_size, page=page)
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Dash Tutorial Ch. 6 - example 5/
+
+Stores output from a slow, I/O-bound step inside a hidden Div, computed by an
+async callback.
+
+The tutorial's hidden div example stands in for slow processing with
+time.sleep(5), which holds a server thread for five seconds per user. Here
+the slow step is awaited instead, so while it waits the server can answer
+other users' requests. Run this file directly to serve it from the asyncio
+server in utils/async_server.py; the graph and table callbacks are ordinary
+functions and run in its thread pool.
+
+"""
+
+import asyncio
+import io
+import os
+
+from dash import Dash
+from dash.dependencies import Input, Output
+from dash.exceptions import PreventUpdate
+import dash_core_components as dcc
+import dash_html_components as html
+import pandas as pd
+
+from utils import encoding
+from utils.async_server import AsyncCallbacks
+from utils.tables import table_rows
+
+app = Dash(__name__)
+
+async_callbacks = AsyncCallbacks(app)
+
+# seconds the slow step takes (the benchmark harness shortens it)
+DELAY = float(os.environ.get('DASH_TUTORIALS_ASYNC_DELAY', 5))
+
+df = pd.DataFrame([
+    [1, 2],
+    [2, 2],
+    [4, 8],
+    [1, 9],
+    [3, 7],
+    [6, 2],
+
+], columns=['x', 'y'])
+
+graph = dcc.Graph(id='graph')
+tbl = html.Table(id='table')
+
+options = [
+    {'label': i, 'value': df.iloc[i].x} for i in df.index
+]
+dropdown = dcc.Dropdown(id='dropdown', options=options)
+
+hidden_div = html.Div(id='intermediate-value', style={'display': 'none'})
+
+components = [graph, tbl, dropdown, hidden_div]
+
+app.layout = html.Div(components)
+
+async def fetch_cleaned(value):
+    # stands in for a slow remote call, such as a query to another service
+    await asyncio.sleep(DELAY)
+    return df[df.index != value]
+
+@async_callbacks.callback(
+    Output('intermediate-value', 'children'),
+    [Input('dropdown', 'value')]
+)
+async def clean_data(value):
+    cleaned_df = await fetch_cleaned(value)
+    return cleaned_df.to_json(orient='split')
+
+def create_figure(df):
+    data = [{
+        'x': df.x,
+        'y': df.y,
+        'text': df.index,
+        'mode': 'markers',
+        'opacity': 0.7,
+        'marker': {'size': 15, 'line': {'width': 0.5, 'color': 'white'}}
+    }]
+
+    layout = dict(
+        xaxis={'title': 's', 'range':[0, 10]},
+        yaxis={'title': 'y', 'range': [0, 10]},
+        margin={'l': 40, 'b': 40, 't': 10, 'r': 10},
+        legend={'x': 0, 'y': 1},
+        hovermode='closest',
+        transition={'duration': 500}
+    )
+
+    return encoding.prepare_figure({
+        'data': data,
+        'layout': layout
+    })
+
+@app.callback(
+    Output('graph', 'figure'),
+    [Input('intermediate-value', 'children')]
+)
+def update_graph(jsonified_cleaned_data):
+    if jsonified_cleaned_data is None:
+        # nothing has been cleaned yet
+        raise PreventUpdate
+
+    dff = pd.read_json(io.StringIO(jsonified_cleaned_data), orient='split')
+
+    figure = create_figure(dff)
+
+    return figure
+
+@app.callback(
+    Output('table', 'children'),
+    [Input('intermediate-value', 'children')]
+)
+def update_table(jsonified_cleaned_data):
+    if jsonified_cleaned_data is None:
+        # nothing has been cleaned yet
+        raise PreventUpdate
+
+    dff = pd.read_json(io.StringIO(jsonified_cleaned_data), orient='split')
+
+    table = table_rows(dff, max_rows=len(dff))
+
+    return table
+
+if __name__ == '__main__':
+    async_callbacks.run_server(debug=True)
@@ -8,16 +8,30 @@ to make accessible across multiple Python processes.
 
 """
 
+import os
 import time
 
-from dash import Dash
+from dash import Dash, no_update
 from dash.dependencies import Input, Output
+from dash.exceptions import PreventUpdate
 import dash_core_components as dcc
 import dash_html_components as html
 import pandas as pd
 
+from utils import datasets, encoding
+from utils.frame_store import FrameStore
+from utils.jobs import JobRunner
+from utils.tables import table_rows
+
 app = Dash(__name__)
 
+# intermediate frames live on the server; the hidden div only holds a token
+frame_store = FrameStore(os.path.join(datasets.CACHE_DIR, 'frames'))
+
+# slow processing runs in a process pool so request workers stay free; a
+# cached result is only reused while its frame is still in the store
+job_runner = JobRunner(ttl=frame_store.ttl, valid=lambda token: token in frame_store)
+
 df = pd.DataFrame([
     [1, 2],
     [2, 2],
@@ -38,19 +52,41 @@ dropdown = dcc.Dropdown(id='dropdown', options=options)
 
 hidden_div = html.Div(id='intermediate-value', style={'display': 'none'})
 
-components = [graph, tbl, dropdown, hidden_div]
+# shows progress while the processing job runs, and polls for its result
+job_status = html.Div(id='job-status')
+job_poll = dcc.Interval(id='job-poll', interval=500, disabled=True)
+
+# set by the graph and table when their frame has expired, to have it processed again
+frame_missing = [dcc.Store(id='graph-frame-missing'), dcc.Store(id='table-frame-missing')]
+
+components = [graph, tbl, dropdown, hidden_div, job_status, job_poll] + frame_missing
 
 app.layout = html.Div(components)
 
-@app.callback(
-    Output('intermediate-value', 'children'),
-    [Input('dropdown', 'value')]
-)
-def clean_data(value):
-    # some expensive data processing step
+def process_data(value):
+    # some expensive data processing step, run in a worker process
     time.sleep(5)
     dff = df[df.index != value]
-    return dff.to_json(orient='split')
+    return frame_store.put(dff)
+
+@app.callback(
+    [Output('intermediate-value', 'children'),
+    Output('job-status', 'children'),
+    Output('job-poll', 'disabled')],
+    [Input('dropdown', 'value'),
+    Input('job-poll', 'n_intervals'),
+    Input('graph-frame-missing', 'data'),
+    Input('table-frame-missing', 'data')]
+)
+def clean_data(value, n_intervals, graph_missing, table_missing):
+    # a result whose frame has expired isn't reused, so this starts the job again
+    status = job_runner.poll(process_data, value)
+
+    # keep polling, and leave the previous result in place, until the job is done
+    if not status.done:
+        return no_update, 'Processing... {:.0f}s'.format(status.elapsed), False
+
+    return status.result, '', True
 
 def create_figure(df):
     data = [{
@@ -71,41 +107,48 @@ def create_figure(df):
         transition={'duration': 500}
     )
 
-    return {
+    return encoding.prepare_figure({
         'data': data,
         'layout': layout
-    }
+    })
+
+def load_frame(token):
+    if token is None:
+        # nothing has been processed yet
+        raise PreventUpdate
+    try:
+        return frame_store.get(token)
+    except KeyError:
+        # evicted since clean_data stored it
+        return None
 
 @app.callback(
-    Output('graph', 'figure'),
+    [Output('graph', 'figure'), Output('graph-frame-missing', 'data')],
     [Input('intermediate-value', 'children')]
 )
-def update_graph(jsonified_data):
-    dff = pd.read_json(jsonified_data, orient='split')
+def update_graph(token):
+    dff = load_frame(token)
+    if dff is None:
+        # keep the old figure and have clean_data process the data again,
+        # rather than waiting for it on this request thread
+        return no_update, time.time()
 
     figure = create_figure(dff)
 
-    return figure
-
-def create_table(df):
-    return html.Table(
-        [html.Tr(html.Th(col) for col in df.columns)] +
-        
-        [html.Tr([
-            html.Td(df.iloc[i][col]) for col in df.columns
-        ]) for i in range(len(df))]
-    )
+    return figure, no_update
 
 @app.callback(
-    Output('table', 'children'),
+    [Output('table', 'children'), Output('table-frame-missing', 'data')],
     [Input('intermediate-value', 'children')]
 )
-def update_table(jsonified_data):
-    dff = pd.read_json(jsonified_data, orient='split')
+def update_table(token):
+    dff = load_frame(token)
+    if dff is None:
+        return no_update, time.time()
 
-    table = create_table(dff)
+    table = table_rows(dff, max_rows=len(dff))
     
-    return table
+    return table, no_update
 
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Dash Tutorial Ch. 6 - example 4/
+
+Keeps per-user derived data on the server, in a store keyed by session.
+
+Fixes the example in "bad_way.py" without shipping the data through the
+browser: the filtered frame is stored for the user's session, in a SQLite
+file shared by every worker process, and later callbacks read it back
+instead of filtering again. Only a small version number passes through
+the browser, to tell those callbacks that the filtered frame changed.
+
+"""
+
+import os
+
+from dash import Dash
+from dash.dependencies import Input, Output
+import dash_core_components as dcc
+import dash_html_components as html
+import numpy as np
+import pandas as pd
+
+from utils import datasets
+from utils.session_store import SessionStore
+from utils.tables import table_rows
+
+app = Dash(__name__)
+
+# per-session entries expire after half an hour idle, within a byte budget
+store = SessionStore(app, os.path.join(datasets.CACHE_DIR, 'sessions.sqlite'))
+
+rng = np.random.RandomState(0)
+df = pd.DataFrame({
+    'region': rng.choice(['North', 'South', 'East', 'West'], 100000),
+    'product': rng.choice(['a', 'b', 'c', 'd', 'e'], 100000),
+    'amount': rng.lognormal(3, 1, 100000).round(2)
+})
+
+dropdown = dcc.Dropdown(
+    id='region',
+    options=[{'label': i, 'value': i} for i in sorted(df.region.unique())],
+    value='North'
+)
+
+metric = dcc.RadioItems(
+    id='metric',
+    options=[{'label': i, 'value': i} for i in ['sum', 'mean', 'count']],
+    value='sum',
+    labelStyle={'display': 'inline-block'}
+)
+
+# changes whenever this user's filtered frame does
+version = dcc.Store(id='filter-version')
+
+output = html.Div(id='output')
+tbl = html.Table(id='table')
+
+components = [dropdown, metric, version, output, tbl]
+
+app.layout = html.Div(components)
+
+def filter_region(region):
+    return df[df['region'] == region]
+
+@app.callback(
+    [Output('filter-version', 'data'), Output('output', 'children')],
+    [Input('region', 'value')])
+def filter_data(value):
+    # derived state goes in this user's session, never in a global; a region
+    # this session has already filtered is read back rather than filtered again
+    filtered_df = store.get_or_set(f'filtered:{value}', lambda: filter_region(value))
+    return value, f'{len(filtered_df):,} rows in {value}'
+
+@app.callback(
+    Output('table', 'children'),
+    [Input('metric', 'value'), Input('filter-version', 'data')])
+def summarise(metric, version):
+    # read back this user's frame rather than filtering again (unless it
+    # has expired). The version is the region it was filtered by, and is part
+    # of the key, so a frame filtered for another region is never read back
+    filtered_df = store.get_or_set(f'filtered:{version}', lambda: filter_region(version))
+
+    summary = filtered_df.groupby('product')['amount'].agg(metric).round(2).reset_index()
+    return table_rows(summary, max_rows=len(summary))
+
+if __name__ == '__main__':
+    app.run_server(debug=True)
@@ -0,0 +1,87 @@
+'''
+Zoom-aware server-side aggregation for large scatter plots.
+
+Sending every row of a multi-million point frame to the browser doesn't work.
+Above a row threshold, density_trace() bins the points inside the visible
+axis ranges into a fixed-size 2D grid, so the payload depends on the grid
+size rather than on the data. When the user zooms, the graph's relayoutData
+carries the new ranges and the same number of bins covers the smaller area,
+which gives a higher-resolution view.
+
+relayoutData only describes the latest relayout event, which may not mention
+the axes at all (a change of dragmode, or a resize), or only one end of one
+axis. update_view() folds each event into the ranges the graph currently
+shows, which an app keeps in a dcc.Store.
+'''
+
+import numpy as np
+
+
+def axis_range(relayout_data, axis):
+    '''
+    Returns the [min, max] range of `axis` ('x' or 'y') set by a relayout
+    event, or None if the event doesn't set both ends of it.
+    '''
+    if not relayout_data:
+        return None
+
+    key = f'{axis}axis.range'
+    if key in relayout_data:
+        return sorted(relayout_data[key])
+    if f'{key}[0]' in relayout_data and f'{key}[1]' in relayout_data:
+        return sorted([relayout_data[f'{key}[0]'], relayout_data[f'{key}[1]']])
+    return None
+
+
+def update_view(view, relayout_data):
+    '''
+    Returns the axis ranges a graph shows after a relayout event, as
+    {'x': range, 'y': range} with None for an autoranged axis, or None if
+    the event didn't change either axis. `view` is the previous result.
+    '''
+    if not relayout_data:
+        return None
+
+    new_view = dict(view or {'x': None, 'y': None})
+    changed = False
+    for axis in ('x', 'y'):
+        key = f'{axis}axis.range'
+        if relayout_data.get(f'{axis}axis.autorange'):
+            new_view[axis] = None
+        elif axis_range(relayout_data, axis) is not None:
+            new_view[axis] = axis_range(relayout_data, axis)
+        elif (f'{key}[0]' in relayout_data or f'{key}[1]' in relayout_data) and new_view[axis]:
+            # dragging one end of an axis only sends that end
+            low, high = new_view[axis]
+            new_view[axis] = sorted([relayout_data.get(f'{key}[0]', low), relayout_data.get(f'{key}[1]', high)])
+        else:
+            continue
+        changed = True
+
+    return new_view if changed else None
+
+
+def density_trace(x, y, x_range=None, y_range=None, bins=100, **trace):
+    '''
+    Returns a heatmap trace counting the points in each cell of a
+    `bins` x `bins` grid over the visible ranges. Empty cells are left blank.
+    '''
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if x_range is None:
+        x_range = [x.min(), x.max()] if len(x) else [0, 1]
+    if y_range is None:
+        y_range = [y.min(), y.max()] if len(y) else [0, 1]
+
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[x_range, y_range])
+    counts[counts == 0] = np.nan
+
+    return dict({
+        'type': 'heatmap',
+        'x': (x_edges[:-1] + x_edges[1:]) / 2,
+        'y': (y_edges[:-1] + y_edges[1:]) / 2,
+        # histogram2d counts are indexed [x, y]; heatmaps want [row=y][col=x]
+        'z': counts.T,
+        'showscale': False,
+        'hoverinfo': 'skip'
+    }, **trace)
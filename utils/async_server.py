@@ -0,0 +1,350 @@
+'''
+Async callbacks, served from an asyncio event loop.
+
+Callbacks that mostly wait - on a remote service, a database, or the
+time.sleep(5) stand-in in sharing_state/hidden_div.py - hold a server
+thread for the whole wait, so a server with 32 threads serves 32 such
+requests at a time. An `async def` callback only holds a coroutine while it
+waits, so one process can keep thousands of them in flight.
+
+AsyncCallbacks registers `async def` callbacks and serves the app from a
+small HTTP/1.1 server on an asyncio loop. Requests for async callbacks are
+run on the loop. Everything else - pages, assets, layout and ordinary
+callbacks - goes to the Flask app through WSGI in a bounded thread pool.
+
+Usage:
+
+    async_callbacks = AsyncCallbacks(app)
+
+    @async_callbacks.callback(Output('intermediate-value', 'children'), [Input('dropdown', 'value')])
+    async def clean_data(value):
+        cleaned = await fetch_and_clean(value)
+        return cleaned
+
+    if __name__ == '__main__':
+        async_callbacks.run_server(port=8050, max_threads=32)
+
+Async callbacks are registered with Dash as well, so the app still works
+under other servers such as gunicorn; there each call runs its coroutine in
+a fresh event loop, on the calling thread.
+
+On the async path Flask isn't involved at all. Requests for async callbacks
+skip:
+
+ * before_request, after_request and teardown handlers on app.server,
+   including any authentication added through them (e.g. dash-auth) -
+   protect the whole server in front of it instead
+ * flask.request, flask.session and flask.g
+ * dash.callback_context, so an async callback can't tell which input
+   triggered it; it gets its inputs and state only
+ * Dash's dev tools error reporting; exceptions are logged and answered
+   with 500
+
+Pattern-matching (ALL/MATCH) outputs aren't supported. Ordinary callbacks
+and every other route go through Flask as usual.
+
+The server reads requests with a Content-Length and rejects chunked bodies
+with 411 Length Required; put it behind a proxy that buffers requests if
+clients need to stream them.
+'''
+
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import io
+import json
+import logging
+import sys
+import traceback
+import urllib.parse
+
+import dash
+from dash.exceptions import PreventUpdate
+import plotly
+
+logger = logging.getLogger(__name__)
+
+# seconds an idle keep-alive connection stays open
+KEEP_ALIVE_TIMEOUT = 15
+MAX_BODY_BYTES = 16 * 2**20
+MAX_HEADERS = 100
+
+REASONS = {
+    200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+    411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error'
+}
+
+_Request = collections.namedtuple('_Request', ['method', 'target', 'version', 'headers', 'body'])
+
+
+class _BadRequest(Exception):
+
+    def __init__(self, status):
+        self.status = status
+
+
+async def _readline(reader):
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        # a line longer than the stream's limit (64 KB)
+        raise _BadRequest(400)
+
+
+async def _read_request(reader):
+    '''
+    Reads one request from a connection, or returns None once it's closed.
+    '''
+    line = await _readline(reader)
+    if not line.strip():
+        return None
+
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise _BadRequest(400)
+
+    headers = []
+    while True:
+        line = await _readline(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, colon, value = line.decode('latin-1').partition(':')
+        if not colon or not name.strip() or len(headers) >= MAX_HEADERS:
+            raise _BadRequest(400)
+        headers.append((name.strip(), value.strip()))
+
+    # only bodies with a known length are read
+    if _header(headers, 'transfer-encoding') is not None:
+        raise _BadRequest(411)
+    try:
+        length = int(_header(headers, 'content-length') or 0)
+    except ValueError:
+        raise _BadRequest(400)
+    if length < 0:
+        raise _BadRequest(400)
+    if length > MAX_BODY_BYTES:
+        raise _BadRequest(413)
+    body = await reader.readexactly(length) if length else b''
+    return _Request(method, target, version, headers, body)
+
+
+def _header(headers, name):
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _keep_alive(request):
+    connection = (_header(request.headers, 'connection') or '').lower()
+    if request.version == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+
+def _environ(request, server_name, server_port, peer):
+    path, _, query = request.target.partition('?')
+    environ = {
+        'REQUEST_METHOD': request.method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': urllib.parse.unquote_to_bytes(path).decode('latin-1'),
+        'QUERY_STRING': query,
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': request.version,
+        'REMOTE_ADDR': peer[0] if peer else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(request.body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in request.headers:
+        key = name.upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = f'HTTP_{key}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def _call_wsgi(wsgi_app, environ):
+    '''
+    Runs a request through a WSGI app, in a pool thread. Returns (status,
+    headers, body).
+    '''
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+        return chunks.append
+
+    result = wsgi_app(environ, start_response)
+    try:
+        chunks.extend(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], b''.join(chunks)
+
+
+def _callback_id(output):
+    # the key Dash gives a callback in app.callback_map, made from its outputs
+    if isinstance(output, (list, tuple)):
+        return '..' + '...'.join(f'{o.component_id}.{o.component_property}' for o in output) + '..'
+    return f'{output.component_id}.{output.component_property}'
+
+
+def _outputs_list(body):
+    # older renderers only send the callback id
+    if body.get('outputs'):
+        return body['outputs']
+    output = body['output']
+    if output.startswith('..'):
+        ids = output[2:-2].split('...')
+    else:
+        ids = [output]
+    outputs = [dict(zip(('id', 'property'), i.rsplit('.', 1))) for i in ids]
+    return outputs if output.startswith('..') else outputs[0]
+
+
+def _values(specs):
+    # each input or state is {'id', 'property', 'value'}
+    return [spec.get('value') for spec in specs]
+
+
+def _callback_response(value, outputs_list, multi):
+    # the same response Dash builds around a callback's return value
+    if isinstance(value, type(dash.no_update)):
+        raise PreventUpdate
+    if not multi:
+        value, outputs_list = [value], [outputs_list]
+
+    component_ids = collections.defaultdict(dict)
+    for val, spec in zip(value, outputs_list):
+        if not isinstance(val, type(dash.no_update)):
+            component_ids[spec['id']][spec['property']] = val
+
+    if not component_ids:
+        raise PreventUpdate
+    return json.dumps({'response': component_ids, 'multi': True}, cls=plotly.utils.PlotlyJSONEncoder)
+
+
+class AsyncCallbacks:
+
+    def __init__(self, app):
+        self.app = app
+        # Dash's callback id (its outputs) -> (coroutine function, multi)
+        self.callbacks = {}
+
+    def callback(self, output, inputs, state=()):
+        '''
+        Decorator for an `async def` callback, with app.callback's arguments.
+        '''
+        multi = isinstance(output, (list, tuple))
+
+        def decorator(func):
+            @functools.wraps(func)
+            def run_to_completion(*args):
+                return asyncio.run(func(*args))
+
+            self.app.callback(output, inputs, list(state))(run_to_completion)
+            self.callbacks[_callback_id(output)] = (func, multi)
+            return func
+        return decorator
+
+    async def _dispatch(self, body, func, multi):
+        try:
+            outputs_list = _outputs_list(body)
+            args = _values(body.get('inputs', []) + body.get('state', []))
+        except (AttributeError, TypeError, ValueError):
+            return 400, [], b''
+
+        try:
+            value = await func(*args)
+            return 200, [('Content-Type', 'application/json')], \
+                _callback_response(value, outputs_list, multi).encode()
+        except PreventUpdate:
+            return 204, [], b''
+
+    async def _respond(self, request, pool, server_name, server_port, peer):
+        update_url = self.app.config.requests_pathname_prefix + '_dash-update-component'
+        if request.method == 'POST' and request.target.split('?')[0] == update_url:
+            try:
+                body = json.loads(request.body)
+                output = body['output']
+            except (ValueError, KeyError, TypeError):
+                return 400, [], b''
+            if isinstance(output, str) and output in self.callbacks:
+                return await self._dispatch(body, *self.callbacks[output])
+
+        environ = _environ(request, server_name, server_port, peer)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, _call_wsgi, self.app.server, environ)
+
+    async def _handle(self, reader, writer, pool, server_name, server_port):
+        peer = writer.get_extra_info('peername')
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except _BadRequest as e:
+                    status, headers, body, keep_alive = e.status, [], b'', False
+                else:
+                    if request is None:
+                        return
+                    keep_alive = _keep_alive(request)
+                    try:
+                        status, headers, body = await self._respond(
+                            request, pool, server_name, server_port, peer
+                        )
+                    except Exception:
+                        logger.error('Exception on %s %s\n%s', request.method, request.target, traceback.format_exc())
+                        status, headers, body = 500, [], b''
+
+                headers = [(k, v) for k, v in headers if k.lower() not in ('content-length', 'connection')]
+                headers += [
+                    ('Content-Length', str(len(body))),
+                    ('Connection', 'keep-alive' if keep_alive else 'close')
+                ]
+                head = f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+                head += ''.join(f'{k}: {v}\r\n' for k, v in headers) + '\r\n'
+                writer.write(head.encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8050, max_threads=32, backlog=4096):
+        '''
+        Serves the app until cancelled.
+        '''
+        with concurrent.futures.ThreadPoolExecutor(max_threads) as pool:
+            server = await asyncio.start_server(
+                functools.partial(self._handle, pool=pool, server_name=host, server_port=port),
+                host, port, backlog=backlog
+            )
+            async with server:
+                await server.serve_forever()
+
+    def run_server(self, host='127.0.0.1', port=8050, max_threads=32, debug=False):
+        '''
+        Serves the app from an asyncio loop, with at most `max_threads`
+        threads for everything that isn't an async callback.
+        '''
+        self.app.enable_dev_tools(debug)
+        print(f'Serving on http://{host}:{port}/ (async callbacks: {len(self.callbacks)})')
+        try:
+            asyncio.run(self.serve(host, port, max_threads))
+        except KeyboardInterrupt:
+            pass
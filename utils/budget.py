@@ -0,0 +1,219 @@
+'''
+CPU, time and output-size budgets for callbacks.
+
+callbacks/multiple_outputs.py computes x**x for whatever number is typed in.
+For x = 10**6 that is a six-million-digit int, which takes the worker
+seconds to compute and longer to turn into JSON, and nothing can interrupt
+it: a thread can't be killed. A budgeted callback runs in a forked child
+process instead, which computes the outputs and encodes them as JSON. If the
+child runs past `timeout` seconds, uses more than `cpu_time` seconds of CPU
+or produces more than `max_output_bytes` of JSON, it is killed and the
+callback returns `fallback`, so the worker is free again straight away.
+
+Usage:
+
+    @app.callback([Output('out', 'children'), Output('err', 'children')], [...])
+    @budgeted(timeout=1, fallback=(no_update, 'That took too long'))
+    def show_factors(num):
+        ...
+
+`fallback` may also be a function, which is called with the callback's
+arguments. The default, no_update, leaves every output as it was. For a
+callback with several outputs, `fallback` may be a list with one value per
+output: then an output that is too large on its own is replaced by its
+fallback, and the others are still shown. A timeout loses every output, so
+give an output that can take long its own callback.
+
+The child exits after each call, taking anything the callback memoized with
+it. With `cache_size`, the worker keeps the last `cache_size` results keyed
+by the callback's arguments, and answers repeats without forking.
+
+At most MAX_CONCURRENT budgeted callbacks run at a time per worker process;
+others wait up to their `timeout` for a slot, then fall back. Children that
+are over budget give up their slot within `timeout`, so the worker stays
+available, but enough concurrent expensive requests can still crowd out
+cheap ones - rate limiting per user is the server's job. Forking costs
+a few milliseconds, so this is for callbacks whose cost depends on what the
+user types, not for every callback. Where fork isn't available (Windows)
+callbacks run in-process, without a budget.
+'''
+
+import collections
+import functools
+import json
+import math
+import multiprocessing
+import os
+import threading
+import warnings
+
+import dash
+from dash.exceptions import PreventUpdate
+import plotly
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# children mostly wait on CPU, so allow a few more than there are cores
+MAX_CONCURRENT = 2 * (os.cpu_count() or 1) + 2
+
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT)
+
+try:
+    _context = multiprocessing.get_context('fork')
+except ValueError:
+    _context = None
+
+# forking a threaded server is safe here: the child only runs the callback
+# and exits, so Python 3.12's warning about it is silenced once, at import
+warnings.filterwarnings(
+    'ignore', message=r'This process .* is multi-threaded, use of fork\(\) may lead to deadlocks',
+    category=DeprecationWarning
+)
+
+# marks an output that didn't fit in what was left of the output budget
+_TOO_LARGE = False
+
+
+class _OverBudget(Exception):
+    pass
+
+
+def _encode(value, budget):
+    # None marks no_update, which can't be encoded
+    if isinstance(value, type(dash.no_update)):
+        return None, budget
+    try:
+        encoded = json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder)
+    except ValueError:
+        # Python 3.11+ refuses to convert ints with more than 4300 digits
+        raise _OverBudget
+    if len(encoded) > budget:
+        raise _OverBudget
+    return encoded, budget - len(encoded)
+
+
+def _run(conn, func, args, cpu_time, max_output_bytes):
+    # runs in the child; the parent kills it once `timeout` has passed
+    if cpu_time is not None:
+        limit = math.ceil(cpu_time)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 1))
+
+    try:
+        result = func(*args)
+        if isinstance(result, (list, tuple)):
+            parts, budget = [], max_output_bytes
+            for value in result:
+                try:
+                    encoded, budget = _encode(value, budget)
+                except _OverBudget:
+                    encoded = _TOO_LARGE
+                parts.append(encoded)
+            conn.send(('list', parts))
+        else:
+            conn.send(('value', _encode(result, max_output_bytes)[0]))
+    except PreventUpdate:
+        conn.send(('prevent', None))
+    except _OverBudget:
+        conn.send(('over', None))
+    except Exception as e:
+        try:
+            conn.send(('error', e))
+        except Exception:
+            # the exception itself can't be pickled
+            conn.send(('error', RuntimeError(repr(e))))
+    finally:
+        conn.close()
+
+
+def _decode(encoded):
+    return dash.no_update if encoded is None else json.loads(encoded)
+
+
+def budgeted(timeout=2.0, cpu_time=None, max_output_bytes=2**20, fallback=dash.no_update, cache_size=0):
+    '''
+    Decorator that runs a callback in a killable child process, within the
+    given wall time, CPU time and JSON output size. Put it below
+    @app.callback.
+    '''
+
+    def decorator(func):
+        results = collections.OrderedDict()
+        results_lock = threading.Lock()
+
+        def fall_back(args):
+            return fallback(*args) if callable(fallback) else fallback
+
+        def cache_key(args):
+            # 2 and 2.0 are equal, but may not be shown the same way
+            key = tuple((type(arg), arg) for arg in args)
+            try:
+                hash(key)
+            except TypeError:
+                return None
+            return key
+
+        def call(args):
+            if not _slots.acquire(timeout=timeout):
+                return 'over', None
+            try:
+                receiver, sender = _context.Pipe(duplex=False)
+                process = _context.Process(
+                    target=_run, args=(sender, func, args, cpu_time, max_output_bytes), daemon=True
+                )
+                process.start()
+                sender.close()
+
+                try:
+                    kind, payload = receiver.recv() if receiver.poll(timeout) else ('over', None)
+                except EOFError:
+                    # killed by the CPU limit
+                    kind, payload = 'over', None
+                finally:
+                    if process.is_alive():
+                        process.kill()
+                    process.join()
+                    receiver.close()
+            finally:
+                _slots.release()
+            return kind, payload
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            if _context is None:
+                return func(*args)
+
+            key = cache_key(args) if cache_size else None
+            with results_lock:
+                cached = results.get(key) if key is not None else None
+                if cached is not None:
+                    results.move_to_end(key)
+
+            kind, payload = cached or call(args)
+
+            # timeouts depend on the load, so only remember finished calls
+            if cached is None and key is not None and kind in ('value', 'list', 'prevent'):
+                with results_lock:
+                    results[key] = (kind, payload)
+                    if len(results) > cache_size:
+                        results.popitem(last=False)
+
+            if kind == 'over':
+                return fall_back(args)
+            if kind == 'prevent':
+                raise PreventUpdate
+            if kind == 'error':
+                raise payload
+            if kind == 'list':
+                if _TOO_LARGE not in payload:
+                    return [_decode(p) for p in payload]
+                fallbacks = fall_back(args)
+                if not isinstance(fallbacks, (list, tuple)) or len(fallbacks) != len(payload):
+                    return fallbacks
+                return [f if p is _TOO_LARGE else _decode(p) for p, f in zip(payload, fallbacks)]
+            return _decode(payload)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,157 @@
+'''
+Resolves chains of callbacks on the server in one request.
+
+In callbacks/chained_callbacks.py, picking a country updates the city
+options, the new options pick a city, and the city updates the text. As
+separate callbacks, the browser waits for each link's response before it
+sends the request for the next one, so a chain of k links costs k round
+trips.
+
+A Chain collects the links with the same decorator arguments as
+app.callback, and register() adds them to the app as one callback, whose
+outputs are all of theirs and whose inputs are all of theirs. When an input
+changes, the links it reaches run in dependency order within the request,
+each seeing the values produced upstream of it, and every update goes back
+in one response.
+
+Usage:
+
+    chain = Chain(app)
+
+    @chain.callback(Output('cities-radio', 'options'), [Input('countries-radio', 'value')])
+    def set_cities_options(selected_country):
+        ...
+
+    chain.register()
+
+Props that a link outputs and another takes as input end up as both an
+output and an input of the merged callback, which Dash allows from 1.19 on.
+Links may raise PreventUpdate or return no_update, which stops the chain
+from going further along that output.
+'''
+
+import dash
+from dash.exceptions import PreventUpdate
+
+
+def _prop_id(dependency):
+    return f'{dependency.component_id}.{dependency.component_property}'
+
+
+class _Link:
+
+    def __init__(self, func, outputs, inputs, state, multi):
+        self.func = func
+        self.outputs = outputs
+        self.inputs = inputs
+        self.state = state
+        self.multi = multi
+
+        self.output_ids = [_prop_id(o) for o in outputs]
+        self.input_ids = [_prop_id(i) for i in inputs]
+        self.state_ids = [_prop_id(s) for s in state]
+
+
+class Chain:
+
+    def __init__(self, app):
+        self.app = app
+        self.links = []
+
+    def callback(self, output, inputs, state=()):
+        '''
+        Decorator for one link of the chain, with app.callback's arguments.
+        '''
+        multi = isinstance(output, (list, tuple))
+        outputs = list(output) if multi else [output]
+
+        def decorator(func):
+            self.links.append(_Link(func, outputs, list(inputs), list(state), multi))
+            return func
+        return decorator
+
+    def _order(self):
+        '''
+        Sorts the links so that each comes after those producing its inputs.
+        '''
+        producers = {}
+        for link in self.links:
+            for output_id in link.output_ids:
+                if output_id in producers:
+                    raise ValueError(f'{output_id} is the output of more than one link')
+                producers[output_id] = link
+
+        ordered = []
+        visiting = set()
+
+        def visit(link):
+            if link in ordered:
+                return
+            if link in visiting:
+                raise ValueError(f'the links through {link.func.__name__} form a cycle')
+            visiting.add(link)
+            for input_id in link.input_ids:
+                upstream = producers.get(input_id)
+                if upstream is not None and upstream is not link:
+                    visit(upstream)
+            visiting.remove(link)
+            ordered.append(link)
+
+        for link in self.links:
+            visit(link)
+        return ordered
+
+    def register(self):
+        '''
+        Adds the chain to the app as a single callback.
+        '''
+        links = self._order()
+
+        outputs, inputs, state = [], [], []
+        output_ids, input_ids, state_ids = [], [], []
+        for link in links:
+            for dependencies, ids, all_dependencies, all_ids in [
+                (link.outputs, link.output_ids, outputs, output_ids),
+                (link.inputs, link.input_ids, inputs, input_ids),
+                (link.state, link.state_ids, state, state_ids)
+            ]:
+                for dependency, prop_id in zip(dependencies, ids):
+                    if prop_id not in all_ids:
+                        all_dependencies.append(dependency)
+                        all_ids.append(prop_id)
+
+        # a prop that is already an input doesn't need to be state as well
+        state = [s for s, prop_id in zip(state, state_ids) if prop_id not in input_ids]
+        state_ids = [prop_id for prop_id in state_ids if prop_id not in input_ids]
+
+        @self.app.callback(outputs, inputs, state)
+        def resolve_chain(*args):
+            values = dict(zip(input_ids + state_ids, args))
+
+            triggered = [t['prop_id'] for t in dash.callback_context.triggered]
+            # on the initial call nothing in particular triggered, so run everything
+            changed = set(input_ids) if triggered in ([], ['.']) else set(triggered)
+
+            updates = {}
+            for link in links:
+                if not changed.intersection(link.input_ids):
+                    continue
+
+                try:
+                    result = link.func(*[values[i] for i in link.input_ids + link.state_ids])
+                except PreventUpdate:
+                    continue
+
+                results = result if link.multi else [result]
+                for prop_id, value in zip(link.output_ids, results):
+                    if value is dash.no_update:
+                        continue
+                    values[prop_id] = value
+                    updates[prop_id] = value
+                    changed.add(prop_id)
+
+            if not updates:
+                raise PreventUpdate
+            return [updates.get(prop_id, dash.no_update) for prop_id in output_ids]
+
+        return resolve_chain
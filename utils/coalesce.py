@@ -0,0 +1,118 @@
+'''
+Per-session coalescing of high-frequency callbacks.
+
+Moving the mouse across a graph fires hoverData changes much faster than the
+hover callbacks can answer them, so requests pile up in the worker. A
+Coalescer runs at most one request at a time per (session, output). When a
+newer request arrives, older ones that are still queued are superseded without
+running, and an older one that is already running has its result dropped, so
+only the latest request is answered with a figure. Queued requests wait on a
+condition that is notified when a newer request arrives, so a superseded
+request returns straight away instead of holding its server thread until
+the running one finishes. Superseded and dropped
+requests raise PreventUpdate, which leaves the output untouched.
+
+Usage:
+
+    coalescer = Coalescer(app)
+
+    @app.callback(Output('x-time-series', 'figure'), [...])
+    @coalescer.coalesce('x-time-series')
+    def update_x_timeseries(...):
+        ...
+
+Counters are served as JSON from /_coalesce.
+'''
+
+import functools
+import threading
+
+import flask
+from dash.exceptions import PreventUpdate
+
+from utils import sessions
+
+
+class _Slot:
+    def __init__(self, lock):
+        # notified when a request starts, finishes or is superseded
+        self.changed = threading.Condition(lock)
+        self.running = False
+        self.generation = 0
+        self.pending = 0
+
+
+class Coalescer:
+
+    def __init__(self, app):
+        self._lock = threading.Lock()
+        self._slots = {}
+        self.counters = {
+            'requests': 0,
+            'queued': 0,
+            'completed': 0,
+            'superseded': 0,
+            'dropped': 0
+        }
+
+        sessions.install(app)
+        app.server.add_url_rule('/_coalesce', 'coalesce_stats', self.stats)
+
+    def stats(self):
+        with self._lock:
+            return flask.jsonify(self.counters)
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self.counters[name] += delta
+
+    def coalesce(self, output):
+        '''
+        Decorator for the callback function that updates `output`.
+        '''
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = (sessions.current_session_id(), output)
+
+                with self._lock:
+                    slot = self._slots.setdefault(key, _Slot(self._lock))
+                    slot.generation += 1
+                    slot.pending += 1
+                    generation = slot.generation
+                    self.counters['requests'] += 1
+                    self.counters['queued'] += 1
+                    slot.changed.notify_all()
+
+                try:
+                    with self._lock:
+                        while slot.running and slot.generation == generation:
+                            slot.changed.wait()
+                        self.counters['queued'] -= 1
+
+                        if slot.generation != generation:
+                            self.counters['superseded'] += 1
+                            raise PreventUpdate
+                        slot.running = True
+
+                    try:
+                        result = func(*args, **kwargs)
+                    finally:
+                        with self._lock:
+                            slot.running = False
+                            slot.changed.notify_all()
+
+                    if slot.generation != generation:
+                        self._count('dropped')
+                        raise PreventUpdate
+
+                    self._count('completed')
+                    return result
+                finally:
+                    with self._lock:
+                        slot.pending -= 1
+                        if not slot.pending:
+                            del self._slots[key]
+
+            return wrapper
+        return decorator
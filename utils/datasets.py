@@ -0,0 +1,245 @@
+'''
+Shared loader for the remote CSV datasets used by the tutorial apps.
+
+Every app used to call pd.read_csv(<url>) at import time, which meant each
+worker re-downloaded and re-parsed the same CSV on every cold start.
+
+read_csv() materialises each source once into an on-disk columnar cache
+(one .npy file per column plus a small meta.json), keyed by the URL and a
+hash of the downloaded content. Later startups load straight from the cache
+without touching the network.
+
+Environment variables:
+
+ * DASH_TUTORIALS_CACHE_DIR - where the columnar cache lives
+   (defaults to ~/.cache/dash-tutorials)
+ * DASH_TUTORIALS_DATA_DIR - a local fixture directory; a file with the same
+   name as the last segment of the URL is used instead of downloading it
+ * DASH_TUTORIALS_REFRESH - set to 1 to re-fetch sources and pick up changes
+ * DASH_TUTORIALS_SHARED - set to 1 to memory-map cached datasets instead of
+   copying them into each process (see read_csv)
+
+pandas is imported inside the functions that need it, so that apps which
+defer their datasets (see utils.deferred) don't pay for it at import.
+'''
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    'DASH_TUTORIALS_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'dash-tutorials')
+)
+
+DATA_DIR = os.environ.get('DASH_TUTORIALS_DATA_DIR')
+
+SHARED = os.environ.get('DASH_TUTORIALS_SHARED') == '1'
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _url_key(url):
+    return _digest(url.encode('utf-8'))
+
+
+def _pointer_path(url, cache_dir):
+    return os.path.join(cache_dir, _url_key(url) + '.json')
+
+
+def _entry_path(url, content_hash, cache_dir):
+    return os.path.join(cache_dir, f'{_url_key(url)}-{content_hash}')
+
+
+def _fetch(url, data_dir):
+    '''
+    Returns the raw bytes of a source, preferring the local fixture directory.
+    '''
+    if data_dir:
+        name = os.path.basename(urllib.parse.urlparse(url).path)
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+
+    with urllib.request.urlopen(url) as response:
+        return response.read()
+
+
+def _write_column(values, path, name):
+    import pandas as pd
+
+    entry = {'name': name, 'file': os.path.basename(path)}
+
+    if values.dtype.kind in 'biufcmM':
+        np.save(path, np.asarray(values))
+    else:
+        codes, categories = pd.factorize(values)
+        np.save(path, codes.astype(_code_dtype(len(categories))))
+        entry['categories'] = categories.tolist()
+
+    return entry
+
+
+def _code_dtype(n_categories):
+    # the dtype pandas would pick for Categorical codes, so that they can be
+    # used without a copy
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _read_column(path, entry, mmap):
+    import pandas as pd
+
+    values = np.load(os.path.join(path, entry['file']), mmap_mode='r' if mmap else None)
+
+    if 'categories' in entry and mmap:
+        # decoding would copy every string into this process - keep the codes
+        # mapped and only the (few) categories in memory
+        return pd.Categorical.from_codes(values, entry['categories'])
+
+    if 'categories' in entry:
+        # a trailing NaN lets missing values (code -1) decode in the same take
+        categories = np.empty(len(entry['categories']) + 1, dtype=object)
+        categories[:-1] = entry['categories']
+        categories[-1] = np.nan
+        values = categories[values]
+
+    return values
+
+
+def write_columns(df, path):
+    '''
+    Writes a frame to `path` as one .npy file per column, plus the index.
+
+    Numeric columns are stored as-is; anything else is factorized into integer
+    codes plus a list of categories kept in meta.json. A RangeIndex is stored
+    as its bounds.
+    '''
+    import pandas as pd
+
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(path) or '.')
+
+    columns = [
+        _write_column(df[col], os.path.join(tmp, f'{i}.npy'), col)
+        for i, col in enumerate(df.columns)
+    ]
+    if isinstance(df.index, pd.RangeIndex):
+        index = {'name': df.index.name, 'range': [df.index.start, df.index.stop, df.index.step]}
+    else:
+        index = _write_column(df.index, os.path.join(tmp, 'index.npy'), df.index.name)
+
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump({'columns': columns, 'index': index, 'rows': len(df)}, f)
+
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # another worker published the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def read_columns(path, mmap=False):
+    '''
+    Reads a frame previously written with write_columns().
+
+    With `mmap`, numeric columns are read-only views of the files on disk
+    rather than copies, and other columns are Categoricals whose codes are
+    such views. Every process that maps the same entry shares its pages, so
+    the frame costs each extra process almost no memory.
+    '''
+    import pandas as pd
+
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+
+    data = {e['name']: _read_column(path, e, mmap) for e in meta['columns']}
+
+    index = None
+    if 'range' in meta.get('index', {}):
+        index = pd.RangeIndex(*meta['index']['range'], name=meta['index']['name'])
+    elif 'index' in meta:
+        index = pd.Index(_read_column(path, meta['index'], mmap), name=meta['index']['name'])
+
+    return pd.DataFrame(
+        data,
+        index=index,
+        columns=[e['name'] for e in meta['columns']],
+        copy=False
+    )
+
+
+def fingerprint(url, cache_dir=None):
+    '''
+    Returns the content hash of the cached copy of `url`, or None.
+    '''
+    pointer = _pointer_path(url, cache_dir or CACHE_DIR)
+    if not os.path.exists(pointer):
+        return None
+
+    with open(pointer) as f:
+        return json.load(f)['content']
+
+
+def read_csv(url, refresh=None, cache_dir=None, data_dir=None, shared=None, **kwargs):
+    '''
+    Drop-in replacement for pd.read_csv(url) backed by the columnar cache.
+
+    With `shared` (or DASH_TUTORIALS_SHARED=1), the frame is a read-only,
+    memory-mapped view of the cache entry (see read_columns), which the first
+    process to load the source publishes for the others. String columns come
+    back as Categoricals.
+
+    Extra keyword arguments are passed to pd.read_csv when the source has to
+    be parsed, and are part of the cache key.
+    '''
+    cache_dir = cache_dir or CACHE_DIR
+    data_dir = data_dir or DATA_DIR
+    if refresh is None:
+        refresh = os.environ.get('DASH_TUTORIALS_REFRESH') == '1'
+    if shared is None:
+        shared = SHARED
+
+    # parse options change the resulting frame, so they belong in the key
+    key = url if not kwargs else url + '?' + json.dumps(kwargs, sort_keys=True, default=str)
+
+    content_hash = None if refresh else fingerprint(key, cache_dir)
+    if content_hash:
+        path = _entry_path(key, content_hash, cache_dir)
+        if os.path.exists(path):
+            return read_columns(path, mmap=shared)
+
+    raw = _fetch(url, data_dir)
+    content_hash = _digest(raw)
+    path = _entry_path(key, content_hash, cache_dir)
+
+    if os.path.exists(path):
+        df = read_columns(path, mmap=shared)
+    else:
+        import pandas as pd
+        df = pd.read_csv(io.BytesIO(raw), **kwargs)
+        os.makedirs(cache_dir, exist_ok=True)
+        write_columns(df, path)
+
+        # drop the parsed copy in favour of the shared one
+        if shared:
+            df = read_columns(path, mmap=True)
+
+    pointer = _pointer_path(key, cache_dir)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir)
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'url': url, 'content': content_hash}, f)
+    os.replace(tmp, pointer)
+
+    return df
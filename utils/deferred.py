@@ -0,0 +1,140 @@
+'''
+Deferred loading of datasets and the structures built from them.
+
+Apps that read a CSV at import time put the download, the parse and the
+pandas import on the critical path of every worker boot and every reloader
+restart. Wrapping that work in a Deferred lets the startup mode decide when
+it happens:
+
+ * eager - at import, as before (the default)
+ * lazy - on first use, i.e. the first callback or page load that needs it
+ * warm - in a background thread started with the server, or on the first
+   request under other servers; anything used before it finishes is loaded
+   on demand
+
+Usage:
+
+    df = deferred.Deferred(lambda: datasets.read_csv(url))
+    cube = deferred.Deferred(lambda: IndicatorCube(df.get()))
+
+    deferred.set_layout(app, serve_layout)
+    deferred.install(app)
+
+Environment variables:
+
+ * DASH_TUTORIALS_STARTUP - eager, lazy or warm
+'''
+
+import functools
+import logging
+import os
+import threading
+import time
+
+MODE = os.environ.get('DASH_TUTORIALS_STARTUP', 'eager')
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# every Deferred created so far, in creation order, for the warm-up thread
+_registry = []
+
+_warm_up_lock = threading.Lock()
+_warm_up_started = False
+
+
+class Deferred:
+    '''
+    A value computed by `factory` on first use, at most once across threads.
+    '''
+
+    def __init__(self, factory, name=None):
+        self.factory = factory
+        self.name = name or getattr(factory, '__qualname__', repr(factory))
+        self._lock = threading.Lock()
+        self._value = _MISSING
+
+        _registry.append(self)
+        if MODE == 'eager':
+            self.get()
+
+    @property
+    def loaded(self):
+        return self._value is not _MISSING
+
+    def get(self):
+        if self._value is _MISSING:
+            with self._lock:
+                if self._value is _MISSING:
+                    self._value = self.factory()
+        return self._value
+
+
+def warm_up():
+    '''
+    Loads every Deferred that isn't loaded yet, in creation order.
+    '''
+    for item in list(_registry):
+        if item.loaded:
+            continue
+        start = time.perf_counter()
+        try:
+            item.get()
+        except Exception:
+            # leave it for the first use to retry, and raise where it's needed
+            logger.exception('warm-up of %s failed', item.name)
+            continue
+        logger.info('warmed up %s in %.0f ms', item.name, (time.perf_counter() - start) * 1e3)
+
+
+def start_warm_up():
+    '''
+    Runs warm_up() in a daemon thread, once per process.
+    '''
+    global _warm_up_started
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+
+    threading.Thread(target=warm_up, name='deferred-warm-up', daemon=True).start()
+
+
+def install(app):
+    '''
+    In warm mode, starts the warm-up thread along with app.run_server, or on
+    the first request when the app is served some other way.
+    '''
+    if MODE != 'warm':
+        return
+
+    run_server = app.run_server
+
+    @functools.wraps(run_server)
+    def run_server_and_warm_up(*args, **kwargs):
+        # with the reloader on, this process only watches files - the child serves
+        reloader = kwargs.get('use_reloader', kwargs.get('debug', False))
+        if not reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_warm_up()
+        return run_server(*args, **kwargs)
+
+    app.run_server = run_server_and_warm_up
+    app.server.before_request(start_warm_up)
+
+
+def set_layout(app, build):
+    '''
+    Uses `build()` as the app's layout. Outside eager mode it is called on
+    each page load instead of now, so the data it shows can stay deferred.
+    '''
+    if MODE == 'eager':
+        app.layout = build()
+        return
+
+    # Dash calls a layout function on assignment to build a validation layout
+    # for multi-page apps. These apps have one page, so skip that call.
+    app.validation_layout = [build]
+    app.layout = build
+    app.validation_layout = None
+
@@ -0,0 +1,115 @@
+'''
+Multiplexed transport for a graph's interaction events.
+
+Registering one callback per interactive attribute (hoverData, clickData,
+selectedData, relayoutData) turns every interaction into its own
+/_dash-update-component request. An EventChannel instead collects all of a
+graph's events in the browser (interactive_graphing/assets/events.js), sends
+them as one batch per animation frame over a single keep-alive connection,
+and fans them out to handlers on the server. Within a batch only the latest
+event of each type is dispatched. Each handler renders the text of one
+element, and the browser writes the returned texts straight into the page.
+
+Usage:
+
+    channel = EventChannel(app, 'basic-interactions')
+    app.layout = html.Div([channel.container(graph), html.Pre(id='hover-data')])
+
+    @channel.on('hoverData', 'hover-data')
+    def display_hover_data(hover_data):
+        return json.dumps(hover_data)
+
+    app.run_server(request_handler=KeepAliveRequestHandler)
+
+A batch can be posted to /_events/<graph id> (under the app's pathname
+prefix) by hand, e.g. with the Flask test client or curl:
+
+    {"events": [{"type": "hoverData", "data": {"points": [...]}}]}
+
+A batch that isn't shaped like this, or names an unknown event type, is
+answered with 400 Bad Request.
+'''
+
+import collections
+
+import dash_html_components as html
+import flask
+from werkzeug.serving import WSGIRequestHandler
+
+EVENT_TYPES = ('hoverData', 'clickData', 'selectedData', 'relayoutData')
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    '''
+    Lets the development server keep connections open between batches.
+    '''
+    protocol_version = 'HTTP/1.1'
+
+
+class EventChannel:
+
+    def __init__(self, app, graph_id):
+        self.graph_id = graph_id
+        # what the browser posts to, and the route Flask serves it on; they
+        # differ when a proxy strips a prefix from requests
+        self.url = f'{app.config.requests_pathname_prefix}_events/{graph_id}'
+        self.handlers = collections.defaultdict(list)
+
+        app.server.add_url_rule(
+            f'{app.config.routes_pathname_prefix}_events/{graph_id}', f'events_{graph_id}',
+            self.dispatch, methods=['POST']
+        )
+
+    def container(self, graph, **kwargs):
+        '''
+        Wraps `graph` in a Div that tells events.js where to send its events.
+        '''
+        return html.Div([graph], **{'data-events': self.url}, **kwargs)
+
+    def on(self, event_type, target):
+        '''
+        Decorator registering a handler for one event type; its return value
+        becomes the text of the element with id `target`.
+        '''
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f'Unknown event type {event_type!r}, expected one of {EVENT_TYPES}')
+
+        def decorator(func):
+            self.handlers[event_type].append((target, func))
+            return func
+        return decorator
+
+    @staticmethod
+    def parse(body):
+        '''
+        Returns the events in a posted batch, raising ValueError if it is
+        malformed.
+        '''
+        events = body.get('events') if isinstance(body, dict) else None
+        if not isinstance(events, list):
+            raise ValueError('expected {"events": [...]}')
+        for event in events:
+            if not isinstance(event, dict) or event.get('type') not in EVENT_TYPES:
+                raise ValueError(f'expected events with a type in {EVENT_TYPES}, got {event!r:.100}')
+        return events
+
+    def handle(self, events):
+        '''
+        Dispatches a batch of events and returns {target: text}.
+        '''
+        latest = {}
+        for event in events:
+            latest[event['type']] = event.get('data')
+
+        updates = {}
+        for event_type, data in latest.items():
+            for target, func in self.handlers.get(event_type, []):
+                updates[target] = func(data)
+        return updates
+
+    def dispatch(self):
+        try:
+            events = self.parse(flask.request.get_json(silent=True))
+        except ValueError as e:
+            flask.abort(400, str(e))
+        return flask.jsonify({'updates': self.handle(events)})
@@ -0,0 +1,120 @@
+'''
+Server-side store for intermediate frames shared between callbacks.
+
+The hidden-div pattern from sharing_state/hidden_div.py ships a whole frame
+to the browser as JSON, and every consumer callback posts it back and parses
+it again. With a FrameStore the producing callback writes the frame once, in
+the columnar layout from utils.datasets, and only a short content-addressed
+token travels through the hidden div. Consumers memory-map the columns, so
+numeric data is read without copying or parsing.
+
+Entries are files on local disk, so every worker process on the machine sees
+them. They expire after `ttl` seconds without being read, and the least
+recently used entries are evicted once the store grows past `max_bytes`.
+'''
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+from utils import datasets
+
+
+def frame_token(df):
+    '''
+    Returns a short hash of the contents of `df`, including its index.
+    '''
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+def _size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class FrameStore:
+
+    def __init__(self, path, ttl=3600, max_bytes=256 * 2**20):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _entry(self, token):
+        # tokens come back from the browser, so only accept what frame_token makes
+        if not token or not all(c in '0123456789abcdef' for c in token):
+            raise KeyError(token)
+        return os.path.join(self.path, token)
+
+    def put(self, df):
+        '''
+        Stores `df` and returns its token. Storing the same frame twice is free.
+        '''
+        token = frame_token(df)
+        entry = self._entry(token)
+
+        if os.path.exists(entry):
+            os.utime(entry)
+        else:
+            datasets.write_columns(df, entry)
+            self.evict()
+
+        return token
+
+    def _live(self, entry):
+        # entries past their ttl count as gone, even before the next sweep
+        try:
+            return time.time() - os.stat(entry).st_mtime <= self.ttl
+        except FileNotFoundError:
+            return False
+
+    def __contains__(self, token):
+        try:
+            return self._live(self._entry(token))
+        except KeyError:
+            return False
+
+    def get(self, token):
+        '''
+        Returns the frame stored under `token`, raising KeyError if it is
+        missing or has expired.
+        '''
+        entry = self._entry(token)
+        if not self._live(entry):
+            raise KeyError(token)
+        try:
+            os.utime(entry)
+            return datasets.read_columns(entry, mmap=True)
+        except FileNotFoundError:
+            raise KeyError(token)
+
+    def evict(self):
+        '''
+        Removes expired entries, then the least recently used ones until the
+        store fits in `max_bytes`.
+        '''
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.path):
+                if not entry.is_dir():
+                    continue
+                accessed = entry.stat().st_mtime
+                if now - accessed > self.ttl:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    entries.append((accessed, _size(entry.path), entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
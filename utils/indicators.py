@@ -0,0 +1,100 @@
+'''
+Precomputed lookups over the long-format country_indicators dataset.
+
+The dataset has one row per (Country Name, Indicator Name, Year) with a single
+Value column. Callbacks used to re-scan the whole frame with boolean masks on
+every interaction; the structures here are built once at load instead.
+'''
+
+import numpy as np
+
+
+class IndicatorCube:
+    '''
+    Dense country x year x indicator cube of the `Value` column.
+
+    The array is laid out as [year, indicator, country] so that the values of
+    one indicator in one year - what a scatter plot needs - are a contiguous
+    slice. Missing combinations are NaN.
+    '''
+
+    def __init__(self, df):
+        country_codes, countries = df['Country Name'].factorize()
+        year_codes, years = df['Year'].factorize(sort=True)
+        indicator_codes, indicators = df['Indicator Name'].factorize()
+
+        self.countries = np.asarray(countries, dtype=object)
+        self.years = np.asarray(years)
+        self.indicators = np.asarray(indicators, dtype=object)
+
+        self.country_index = {c: i for i, c in enumerate(self.countries)}
+        self.year_index = {int(y): i for i, y in enumerate(self.years)}
+        self.indicator_index = {n: i for i, n in enumerate(self.indicators)}
+
+        shape = (len(self.years), len(self.indicators), len(self.countries))
+        self.values = np.full(shape, np.nan)
+        self.values[year_codes, indicator_codes, country_codes] = df['Value'].to_numpy(dtype=float)
+
+    def scatter(self, x_name, y_name, year):
+        '''
+        Returns (countries, x, y) for one year, aligned by country.
+
+        Countries missing either indicator in that year are left out. A
+        cleared (None) or unknown year or indicator matches no rows, as the
+        boolean masks this replaced did.
+        '''
+        try:
+            year_code = self.year_index[int(year)]
+        except (TypeError, ValueError, KeyError):
+            year_code = None
+        x_code = self.indicator_index.get(x_name)
+        y_code = self.indicator_index.get(y_name)
+
+        if year_code is None or x_code is None or y_code is None:
+            return self.countries[:0], np.empty(0), np.empty(0)
+
+        layer = self.values[year_code]
+        x = layer[x_code]
+        y = layer[y_code]
+
+        keep = ~(np.isnan(x) | np.isnan(y))
+        return self.countries[keep], x[keep], y[keep]
+
+
+class SeriesIndex:
+    '''
+    Per-(country, indicator) offsets into the data sorted by
+    (country, indicator, year).
+
+    series() returns the years and values of one time series as slices of two
+    sorted arrays, so a lookup is a dict hit plus two zero-copy views.
+    '''
+
+    def __init__(self, df):
+        country_codes, countries = df['Country Name'].factorize()
+        indicator_codes, indicators = df['Indicator Name'].factorize()
+        years = df['Year'].to_numpy()
+
+        order = np.lexsort((years, indicator_codes, country_codes))
+        self.years = years[order]
+        self.values = df['Value'].to_numpy(dtype=float)[order]
+
+        country_codes = country_codes[order]
+        indicator_codes = indicator_codes[order]
+
+        # each run of equal (country, indicator) pairs is one series
+        pairs = country_codes.astype(np.int64) * len(indicators) + indicator_codes
+        starts = np.flatnonzero(np.r_[True, pairs[1:] != pairs[:-1]])
+        stops = np.r_[starts[1:], len(pairs)]
+
+        self.offsets = {
+            (countries[country_codes[start]], indicators[indicator_codes[start]]): (int(start), int(stop))
+            for start, stop in zip(starts, stops)
+        }
+
+    def series(self, country, indicator):
+        '''
+        Returns (years, values) for one country and indicator, sorted by year.
+        '''
+        start, stop = self.offsets.get((country, indicator), (0, 0))
+        return self.years[start:stop], self.values[start:stop]
@@ -0,0 +1,120 @@
+'''
+Background execution of slow callback work on a local process pool.
+
+A callback that does seconds of processing holds a request worker for the
+whole time, so cheap callbacks queue up behind it. With a JobRunner the
+callback submits the work and returns straight away with a placeholder; a
+dcc.Interval polls the same callback until the result is ready.
+
+Identical jobs - same function and arguments - that are already running are
+not submitted twice, and finished results are kept in an LRU cache so that
+asking again is free. Cached results expire after `ttl` seconds, and a
+`valid` function can reject one that no longer holds, e.g. a FrameStore token
+whose frame has been evicted; the job is then run again.
+
+Usage:
+
+    runner = JobRunner()
+
+    status = runner.poll(expensive_function, value)
+    if not status.done:
+        return no_update, f'Working... {status.elapsed:.0f}s'
+    return status.result, ''
+
+`expensive_function` runs in another process, so it has to be a module-level
+function and its arguments and result have to be picklable.
+'''
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+JobStatus = collections.namedtuple('JobStatus', ['done', 'result', 'elapsed'])
+
+
+class JobRunner:
+
+    def __init__(self, max_workers=None, max_results=128, ttl=None, valid=None):
+        self.max_workers = max_workers
+        self.max_results = max_results
+        self.ttl = ttl
+        self.valid = valid
+        self._executor = None
+        self._lock = threading.Lock()
+        self._running = {}
+        self._results = collections.OrderedDict()
+
+    def _pool(self):
+        # created on first use so importing an app doesn't start processes
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    @staticmethod
+    def key(func, args):
+        return (func.__module__, func.__qualname__, args)
+
+    def submit(self, func, *args):
+        '''
+        Starts `func(*args)` unless the same job is already running, and
+        returns its (future, start time).
+        '''
+        key = self.key(func, args)
+        with self._lock:
+            if key not in self._running:
+                self._running[key] = (self._pool().submit(func, *args), time.time())
+            return self._running[key]
+
+    def _cached(self, key):
+        # called with the lock held
+        if key not in self._results:
+            return False, None
+        result, stored = self._results[key]
+        expired = self.ttl is not None and time.time() - stored > self.ttl
+        if expired or (self.valid is not None and not self.valid(result)):
+            del self._results[key]
+            return False, None
+        self._results.move_to_end(key)
+        return True, result
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._running.pop(key, None)
+            result = future.result()
+            self._results[key] = (result, time.time())
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+    def poll(self, func, *args):
+        '''
+        Returns a JobStatus for `func(*args)`, submitting the job if it isn't
+        cached or running. Exceptions raised by the job are re-raised here.
+        '''
+        key = self.key(func, args)
+        with self._lock:
+            found, result = self._cached(key)
+        if found:
+            return JobStatus(True, result, 0.0)
+
+        future, started = self.submit(func, *args)
+        if not future.done():
+            return JobStatus(False, None, time.time() - started)
+
+        return JobStatus(True, self._finish(key, future), time.time() - started)
+
+    def run(self, func, *args):
+        '''
+        Returns the result of `func(*args)`, waiting for the job if it isn't
+        cached.
+        '''
+        key = self.key(func, args)
+        with self._lock:
+            found, result = self._cached(key)
+        if found:
+            return result
+
+        future, _ = self.submit(func, *args)
+        future.result()
+        return self._finish(key, future)
@@ -0,0 +1,274 @@
+'''
+Markdown documents rendered once on the server and served as cached HTML.
+
+layout/markdown.py used to read text.md at import and send the Markdown to
+the browser, where dcc.Markdown rendered it on every page load; edits to the
+file needed a restart. A MarkdownContent renders each registered file to
+HTML with the markdown package, sanitizes the HTML, and keeps the result in
+memory. A background thread polls the files, and re-renders one only when
+its mtime or size changed and its content hash did too. Requests to
+/_content/<name> (under the app's routes_pathname_prefix) are a dictionary
+lookup, and are answered with 304 Not Modified when the browser's ETag
+still matches.
+
+If a file can't be read or rendered, e.g. it isn't valid UTF-8 half way
+through an edit, the error is logged and the last good render is still
+served; a document that has never rendered is answered with 503.
+
+Usage:
+
+    content = MarkdownContent(app)
+    content.register('text', os.path.join(os.path.dirname(__file__), 'text.md'))
+
+    app.layout = html.Div([html.Iframe(src=content.url('text'))])
+
+The document is a standalone HTML page, so it is shown in an Iframe, with
+the `stylesheets` passed to MarkdownContent.
+
+Raw HTML in the Markdown is sanitized like everything else: only the tags and
+attributes in ALLOWED_TAGS and ALLOWED_ATTRIBUTES are kept, the contents of
+script, style and similar tags are dropped, and links may only use the
+http, https and mailto schemes.
+'''
+
+import hashlib
+import html
+import html.parser
+import logging
+import os
+import threading
+import urllib.parse
+
+import flask
+import markdown
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'dd', 'del', 'div', 'dl', 'dt', 'em',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 'span',
+    'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul'
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title'},
+    'td': {'align'},
+    'th': {'align'},
+    # fenced code blocks mark their language with a class
+    'code': {'class'},
+    'pre': {'class'},
+    'div': {'class'},
+    'span': {'class'}
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto'}
+
+# dropped along with everything inside them
+DROP_CONTENT = {'script', 'style', 'iframe', 'object', 'template', 'noscript', 'textarea', 'title'}
+
+# elements without an end tag; those not in ALLOWED_TAGS are dropped on their own
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+EXTENSIONS = ['fenced_code', 'tables']
+
+PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+{stylesheets}<title>{title}</title>
+</head>
+<body>
+{body}
+</body>
+</html>
+'''
+
+# nothing in a document runs scripts or loads anything but stylesheets and images
+CONTENT_SECURITY_POLICY = "default-src 'none'; style-src 'self' https:; img-src 'self' https: data:"
+
+
+class _Sanitizer(html.parser.HTMLParser):
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.dropping = 0
+
+    def _start(self, tag, attrs, close):
+        if tag in DROP_CONTENT:
+            if not close:
+                self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+
+        kept = []
+        for name, value in attrs:
+            if name not in ALLOWED_ATTRIBUTES.get(tag, ()) or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                # browsers ignore control characters and spaces in schemes
+                scheme = urllib.parse.urlsplit(''.join(value.split())).scheme.lower()
+                if scheme not in ALLOWED_SCHEMES:
+                    continue
+            kept.append(f' {name}="{html.escape(value)}"')
+        self.out.append(f'<{tag}{"".join(kept)}>')
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, tag in VOID_TAGS)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self.dropping = max(self.dropping - 1, 0)
+        elif not self.dropping and tag in ALLOWED_TAGS and tag not in VOID_TAGS:
+            self.out.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.out.append(html.escape(data, quote=False))
+
+
+def sanitize(fragment):
+    '''
+    Returns an HTML fragment with everything outside the allowlists removed.
+    '''
+    sanitizer = _Sanitizer()
+    sanitizer.feed(fragment)
+    sanitizer.close()
+    return ''.join(sanitizer.out)
+
+
+def render(text):
+    '''
+    Renders Markdown to sanitized HTML.
+    '''
+    return sanitize(markdown.markdown(text, extensions=EXTENSIONS))
+
+
+class _Document:
+
+    def __init__(self, path):
+        self.path = path
+        self.stat = None
+        self.source_hash = None
+        # (page, etag), replaced as a whole so readers never see a mix
+        self.rendered = None
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class MarkdownContent:
+
+    def __init__(self, app, stylesheets=(), poll_interval=1.0):
+        self.stylesheets = list(stylesheets)
+        self.poll_interval = poll_interval
+        self.documents = {}
+        self.renders = 0
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._prefix = app.config.requests_pathname_prefix
+
+        app.server.add_url_rule(
+            app.config.routes_pathname_prefix + '_content/<name>', 'markdown_content', self.serve
+        )
+
+    def url(self, name):
+        return f'{self._prefix}_content/{name}'
+
+    def register(self, name, path):
+        '''
+        Serves the Markdown file at `path` as /_content/<name>.
+        '''
+        with self._lock:
+            self.documents[name] = _Document(os.path.abspath(path))
+        self._start_watcher()
+
+    def _start_watcher(self):
+        if self._watcher is None and self.poll_interval:
+            self._watcher = threading.Thread(target=self._watch, name='markdown-content', daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        stop = threading.Event()
+        while not stop.wait(self.poll_interval):
+            for name in list(self.documents):
+                try:
+                    self.refresh(name)
+                except OSError:
+                    # the file is being replaced, or is gone; keep the last render
+                    pass
+                except Exception:
+                    # refresh() only raises once per change, so this doesn't repeat
+                    logger.exception('Could not render %s, keeping its last render', name)
+
+    def refresh(self, name):
+        '''
+        Re-renders a document if its file changed since it was last rendered.
+        Returns the document.
+        '''
+        document = self.documents[name]
+        stat = _stat_key(document.path)
+        if stat == document.stat:
+            return document
+
+        with self._lock:
+            # another thread may have got here first
+            if stat == document.stat:
+                return document
+
+            with open(document.path, 'rb') as f:
+                source = f.read()
+            source_hash = hashlib.sha256(source).hexdigest()
+
+            # touched but not changed, e.g. by a checkout
+            if source_hash != document.source_hash:
+                # a file that doesn't render isn't retried until it changes again
+                document.stat = stat
+                document.source_hash = source_hash
+                title = html.escape(os.path.splitext(os.path.basename(document.path))[0])
+                stylesheets = ''.join(
+                    f'<link rel="stylesheet" href="{html.escape(href)}">\n' for href in self.stylesheets
+                )
+                page = PAGE.format(
+                    stylesheets=stylesheets, title=title, body=render(source.decode('utf-8'))
+                ).encode('utf-8')
+                self.renders += 1
+
+                document.rendered = (page, hashlib.sha256(page).hexdigest()[:32])
+            document.stat = stat
+        return document
+
+    def get(self, name):
+        '''
+        Returns the rendered page and its ETag, rendering it on first use,
+        or None if it has never rendered.
+        '''
+        document = self.documents[name]
+        # without a watcher, check the file on every request instead
+        if document.rendered is None or self._watcher is None:
+            try:
+                document = self.refresh(name)
+            except Exception:
+                logger.exception('Could not render %s', name)
+        return document.rendered
+
+    def serve(self, name):
+        if name not in self.documents:
+            flask.abort(404)
+        rendered = self.get(name)
+        if rendered is None:
+            flask.abort(503)
+        page, etag = rendered
+
+        response = flask.Response(page, mimetype='text/html')
+        response.set_etag(etag)
+        # the page can be cached, but must be revalidated so edits show up
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Content-Security-Policy'] = CONTENT_SECURITY_POLICY
+        return response.make_conditional(flask.request)
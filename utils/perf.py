@@ -0,0 +1,215 @@
+'''
+Opt-in per-callback profiling.
+
+instrument(app) times every request to /_dash-update-component and splits it
+into three phases:
+
+ * decode - from the start of the request until the callback function is
+   called (routing, parsing the JSON body, unpacking inputs)
+ * user - the callback function itself
+ * serialization - from the callback's return until the response is sent
+   (encoding the outputs to JSON)
+
+Each phase, the total and the response size go into a rolling histogram per
+output, served as JSON from /_perf. With a profile rate above zero, that
+fraction of calls also run under cProfile, and the latest capture for an
+output is served as text from /_perf/<output>.
+
+Usage, before any callbacks are registered (and before other helpers that
+add request hooks, so the whole request is timed):
+
+    app = dash.Dash(__name__)
+    perf.instrument(app)
+
+Environment variables:
+
+ * DASH_TUTORIALS_PERF - set to 1 to enable instrumentation
+ * DASH_TUTORIALS_PERF_PROFILE - fraction of calls to profile, e.g. 0.01
+'''
+
+import bisect
+import collections
+import cProfile
+import functools
+import io
+import os
+import pstats
+import random
+import threading
+import time
+
+import flask
+
+# upper bounds of the histogram buckets, in milliseconds
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+PHASES = ['decode', 'user', 'serialization', 'total']
+
+
+class RollingHistogram:
+    '''
+    Keeps the last `window` samples and summarises them on demand.
+    '''
+
+    def __init__(self, window=1000):
+        self.samples = collections.deque(maxlen=window)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def summary(self, buckets=None):
+        values = sorted(self.samples)
+        if not values:
+            return {'count': 0}
+
+        def percentile(p):
+            return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+        summary = {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'p50': percentile(50),
+            'p90': percentile(90),
+            'p99': percentile(99),
+            'max': values[-1]
+        }
+        if buckets:
+            counts = [0] * (len(buckets) + 1)
+            for value in values:
+                counts[bisect.bisect_left(buckets, value)] += 1
+            summary['histogram'] = dict(zip([str(b) for b in buckets] + ['inf'], counts))
+        return summary
+
+
+class _Stats:
+    def __init__(self, window):
+        self.phases = {phase: RollingHistogram(window) for phase in PHASES}
+        self.bytes = RollingHistogram(window)
+        self.profile = None
+
+
+class Profiler:
+
+    def __init__(self, app, profile_rate=0.0, window=1000):
+        self.app = app
+        self.profile_rate = profile_rate
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats = {}
+
+        # wrap callbacks as they are registered, inside Dash's own wrapper
+        register = app.callback
+
+        @functools.wraps(register)
+        def callback(*args, **kwargs):
+            decorator = register(*args, **kwargs)
+            return lambda func: decorator(self.wrap(func))
+
+        app.callback = callback
+
+        server = app.server
+        server.before_request(self.before_request)
+        server.after_request(self.after_request)
+        server.add_url_rule('/_perf', 'perf_stats', self.stats)
+        server.add_url_rule('/_perf/<path:output>', 'perf_profile', self.profile)
+
+    def _entry(self, output):
+        with self._lock:
+            if output not in self._stats:
+                self._stats[output] = _Stats(self.window)
+            return self._stats[output]
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            g = flask.g
+            g.perf_user_start = time.perf_counter()
+
+            if self.profile_rate and random.random() < self.profile_rate:
+                profiler = cProfile.Profile()
+                try:
+                    return profiler.runcall(func, *args, **kwargs)
+                finally:
+                    g.perf_user_end = time.perf_counter()
+                    g.perf_profile = profiler
+            try:
+                return func(*args, **kwargs)
+            finally:
+                g.perf_user_end = time.perf_counter()
+        return wrapper
+
+    def before_request(self):
+        if flask.request.path.endswith('/_dash-update-component'):
+            flask.g.perf_start = time.perf_counter()
+
+    def after_request(self, response):
+        g = flask.g
+        start = g.get('perf_start')
+        if start is None:
+            return response
+
+        end = time.perf_counter()
+        output = (flask.request.get_json(silent=True) or {}).get('output')
+        if output is None:
+            return response
+
+        # requests answered without running the callback (cached, prevented
+        # before the call) count as all decode
+        user_start = g.get('perf_user_start', end)
+        user_end = g.get('perf_user_end', end)
+
+        entry = self._entry(output)
+        durations = {
+            'decode': user_start - start,
+            'user': user_end - user_start,
+            'serialization': end - user_end,
+            'total': end - start
+        }
+        for phase, seconds in durations.items():
+            entry.phases[phase].add(seconds * 1e3)
+        entry.bytes.add(response.calculate_content_length() or 0)
+
+        if g.get('perf_profile') is not None:
+            text = io.StringIO()
+            pstats.Stats(g.perf_profile, stream=text).sort_stats('cumulative').print_stats(25)
+            entry.profile = text.getvalue()
+
+        return response
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._stats.items())
+
+        return flask.jsonify({
+            output: {
+                'phases_ms': {
+                    phase: histogram.summary(BUCKETS_MS) for phase, histogram in entry.phases.items()
+                },
+                'bytes': entry.bytes.summary(),
+                'profile': f'/_perf/{output}' if entry.profile else None
+            }
+            for output, entry in entries
+        })
+
+    def profile(self, output):
+        with self._lock:
+            entry = self._stats.get(output)
+        if entry is None or entry.profile is None:
+            flask.abort(404)
+        return flask.Response(entry.profile, mimetype='text/plain')
+
+
+def instrument(app, enabled=None, profile_rate=None, window=1000):
+    '''
+    Instruments the callbacks of `app` registered from now on, if enabled by
+    argument or DASH_TUTORIALS_PERF. Returns the Profiler, or None.
+    '''
+    if enabled is None:
+        enabled = os.environ.get('DASH_TUTORIALS_PERF') == '1'
+    if not enabled:
+        return None
+
+    if profile_rate is None:
+        profile_rate = float(os.environ.get('DASH_TUTORIALS_PERF_PROFILE', 0))
+
+    return Profiler(app, profile_rate, window)
@@ -0,0 +1,157 @@
+'''
+Integer factorization for advanced_callbacks/no_update.py.
+
+Trial division up to sqrt(n) takes seconds for an 18-digit semiprime, which
+ties up a worker for as long. Here small factors are divided out with a
+cached sieve of primes, what remains is tested with Miller-Rabin, and
+composite cofactors are split with Pollard's rho (Brent's variant), which
+takes roughly n**(1/4) steps instead of n**(1/2). Results are memoized.
+
+All arithmetic is on Python ints, so factors are exact for ints of any size:
+their product is always n. Miller-Rabin with the first 13 primes as bases
+is deterministic below 3.3 * 10**24; above that, 20 extra random bases are
+tried, so a composite is mistaken for a prime with probability below 4**-33.
+'''
+
+import functools
+import math
+import random
+
+SIEVE_LIMIT = 2**16
+
+# with these bases Miller-Rabin is exact for n < 3,317,044,064,679,887,385,961,981
+BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+DETERMINISTIC_LIMIT = 3317044064679887385961981
+EXTRA_ROUNDS = 20
+
+
+@functools.lru_cache(maxsize=None)
+def small_primes(limit=SIEVE_LIMIT):
+    '''
+    Returns the primes below `limit`, by the sieve of Eratosthenes.
+    '''
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b'\x00\x00'
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return tuple(i for i, is_prime in enumerate(sieve) if is_prime)
+
+
+def _strong_probable_prime(n, d, s, base):
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def is_prime(n):
+    '''
+    Miller-Rabin primality test, exact below 3.3 * 10**24 (see above).
+    '''
+    if n < 2:
+        return False
+    for p in BASES:
+        if n % p == 0:
+            return n == p
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+
+    if not all(_strong_probable_prime(n, d, s, base) for base in BASES):
+        return False
+    if n < DETERMINISTIC_LIMIT:
+        return True
+
+    rng = random.Random(n)
+    return all(
+        _strong_probable_prime(n, d, s, rng.randrange(2, n - 1)) for _ in range(EXTRA_ROUNDS)
+    )
+
+
+def pollard_rho(n, seed=1):
+    '''
+    Returns a nontrivial factor of the odd composite `n`, by Brent's variant
+    of Pollard's rho.
+    '''
+    rng = random.Random(seed)
+    while True:
+        y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+        g, r, q = 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                # multiply the differences together and take one gcd per batch
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+
+        if g == n:
+            # the batch overshot, so step back through it one at a time
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+
+        if g != n:
+            return g
+        # the cycle closed without a factor, so try another polynomial
+
+
+def _split(n, out):
+    if n == 1:
+        return
+    if is_prime(n):
+        out.append(n)
+        return
+    # perfect powers would send rho round in circles, so take the root first
+    root = math.isqrt(n)
+    if root * root == n:
+        _split(root, out)
+        _split(root, out)
+        return
+    factor = pollard_rho(n)
+    _split(factor, out)
+    _split(n // factor, out)
+
+
+@functools.lru_cache(maxsize=1024)
+def _factorize(n):
+    out = []
+    for p in small_primes():
+        if p * p > n:
+            break
+        while n % p == 0:
+            out.append(p)
+            n //= p
+    if n > 1:
+        if n < SIEVE_LIMIT**2:
+            # no factors below the sieve limit, so what's left is prime
+            out.append(n)
+        else:
+            _split(n, out)
+    return tuple(sorted(out))
+
+
+def prime_factors(n):
+    '''
+    Returns the prime factors of the positive int `n` in ascending order,
+    with repeats, e.g. prime_factors(12) == [2, 2, 3]. prime_factors(1) is [].
+    '''
+    if isinstance(n, bool) or not isinstance(n, int):
+        raise TypeError(f'expected an int, got {type(n).__name__}')
+    if n < 1:
+        raise ValueError(f'expected a positive int, got {n}')
+    return list(_factorize(n))
@@ -0,0 +1,253 @@
+'''
+Memoization of deterministic callbacks at the HTTP layer.
+
+A figure callback such as update_graph in callbacks/multiple_inputs.py only
+depends on its inputs, yet every request re-runs the pandas work and
+re-encodes the figure to JSON. ResponseCache sits in front of Dash's
+/_dash-update-component route: the first response for a given set of inputs
+is stored as the exact bytes Dash produced, and repeated requests are answered
+with those bytes before Dash runs the callback at all.
+
+Usage:
+
+    cache = ResponseCache(app, SQLiteStore(path), fingerprint=...)
+    cache.memoize(Output('indicator-graphic', 'figure'))
+
+For outputs with a small, known input domain, prerender() fills the cache up
+front so that every request is a lookup.
+
+The store may outlive the process, so keys also cover what produced the
+bytes: a hash of the source file that defines the callback, and whether
+figures are encoded as typed arrays (utils.encoding). Editing the callback,
+or a helper in its file, and restarting gives new keys.
+'''
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import flask
+
+from utils import encoding
+
+
+class SQLiteStore:
+    '''
+    Byte-budgeted LRU store kept in a SQLite file.
+
+    All worker processes pointed at the same file share one cache. Once the
+    stored values exceed `max_bytes`, the least recently used are evicted.
+    '''
+
+    def __init__(self, path, max_bytes=64 * 2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+
+    def _connect(self):
+        # sqlite connections can't be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        with conn:
+            conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                (key, value, len(value), time.time())
+            )
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            evict = []
+            for old_key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed'):
+                if total <= self.max_bytes:
+                    break
+                evict.append((old_key,))
+                total -= size
+            conn.executemany('DELETE FROM entries WHERE key = ?', evict)
+
+
+class MemoryStore:
+    '''
+    Unbounded in-process store, for small fixed sets of responses.
+    '''
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries[key] = value
+
+
+def output_key(output):
+    '''
+    Dash's name for a callback output: an Output or an 'id.property' string.
+    '''
+    if isinstance(output, str):
+        return output
+    return f'{output.component_id}.{output.component_property}'
+
+
+def code_version(func):
+    '''
+    Returns a hash of the source file that defines `func`, or of its
+    bytecode if the file can't be found.
+    '''
+    func = inspect.unwrap(func)
+    try:
+        with open(inspect.getsourcefile(func), 'rb') as f:
+            source = f.read()
+    except (OSError, TypeError):
+        source = func.__code__.co_code
+    return hashlib.sha256(source).hexdigest()[:16]
+
+
+class ResponseCache:
+    '''
+    Serves repeated /_dash-update-component requests for memoized outputs from
+    `store`, without calling the callback.
+
+    The cache key covers the output, the values of all inputs and state, the
+    callback's code_version() and encoding settings, and `fingerprint` - pass
+    something that changes with the underlying data, e.g.
+    datasets.fingerprint(url). For deferred datasets, pass a function
+    instead; it is called once, on the first memoized request.
+    '''
+
+    def __init__(self, app, store, fingerprint=''):
+        self.store = store
+        self.app = app
+        self.fingerprint = fingerprint
+        self.outputs = set()
+        # output -> version of the code that renders it, found on first use
+        self._versions = {}
+        self.hits = 0
+        self.misses = 0
+
+        app.server.before_request(self._serve_cached)
+        app.server.after_request(self._save_response)
+
+    def _fingerprint(self):
+        if callable(self.fingerprint):
+            self.fingerprint = self.fingerprint()
+        return self.fingerprint
+
+    def _version(self, output):
+        version = self._versions.get(output)
+        if version is None:
+            version = self._versions[output] = [
+                code_version(self.app.callback_map[output]['callback']),
+                encoding.TYPED_ARRAYS
+            ]
+        return version
+
+    def memoize(self, output):
+        self.outputs.add(output_key(output))
+
+    def prerender(self, output, input_values):
+        '''
+        Runs the callback for `output` once per tuple in `input_values` and
+        stores the responses.
+
+        Requests go through the Flask test client, so the cached bytes are
+        exactly what Dash would have sent. The callback must be registered.
+        '''
+        key = output_key(output)
+        self.memoize(key)
+
+        spec = self.app.callback_map[key]
+        component_id, component_property = key.rsplit('.', 1)
+        client = self.app.server.test_client()
+
+        for values in input_values:
+            inputs = [
+                dict(i, value=value) for i, value in zip(spec['inputs'], values)
+            ]
+            client.post(
+                self.app.config.requests_pathname_prefix + '_dash-update-component',
+                json={
+                    'output': key,
+                    'outputs': {'id': component_id, 'property': component_property},
+                    'inputs': inputs,
+                    'state': [dict(s, value=None) for s in spec.get('state', [])],
+                    'changedPropIds': [f"{i['id']}.{i['property']}" for i in inputs]
+                }
+            )
+
+    def request_key(self):
+        '''
+        Returns the cache key for the current request, or None if the request
+        isn't for a memoized output.
+        '''
+        request = flask.request
+        if request.method != 'POST' or not request.path.endswith('/_dash-update-component'):
+            return None
+
+        body = request.get_json(silent=True) or {}
+        output = body.get('output')
+        if output not in self.outputs or output not in self.app.callback_map:
+            return None
+
+        values = [
+            output,
+            [i.get('value') for i in body.get('inputs', [])],
+            [s.get('value') for s in body.get('state', [])],
+            self._version(output),
+            self._fingerprint()
+        ]
+        encoded = json.dumps(values, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _serve_cached(self):
+        key = self.request_key()
+        if key is None:
+            return None
+
+        body = self.store.get(key)
+        if body is None:
+            self.misses += 1
+            flask.g.response_cache_key = key
+            return None
+
+        self.hits += 1
+        return flask.Response(body, mimetype='application/json')
+
+    def _save_response(self, response):
+        key = flask.g.pop('response_cache_key', None)
+        if key is not None and response.status_code == 200:
+            self.store.set(key, response.get_data())
+        return response
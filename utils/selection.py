@@ -0,0 +1,192 @@
+'''
+Vectorized selection engine for crossfiltering.
+
+Each chart's selection becomes a boolean mask over the rows of the frame, and
+the selection shown on every chart is the AND of those masks. Intersecting
+Python lists of points with np.intersect1d sorts on every call; masks keep
+the cost at one pass over the rows per chart.
+
+Rectangle selections don't need the browser to list the selected points at
+all: SortedIndex resolves a selectedData['range'] on the server with a binary
+search per column, in O(log n + k) for k matching rows.
+
+SelectionEngine.select_keyed caches each chart's mask under a key for its
+selection, so when one chart's selection changes only that chart's rows are
+resolved again, and an unchanged set of selections returns the last result.
+'''
+
+import collections
+import threading
+
+import numpy as np
+
+
+def selected_indices(selected_data):
+    '''
+    Returns the row indices (customdata) of the points in a graph's
+    selectedData, or None when nothing is selected.
+    '''
+    if not selected_data or not selected_data.get('points'):
+        return None
+
+    points = selected_data['points']
+    return np.fromiter((p['customdata'] for p in points), dtype=np.intp, count=len(points))
+
+
+def selected_range(selected_data):
+    """
+    Returns the {'x': [x0, x1], 'y': [y0, y1]} range of a rectangle selection,
+    or None when there isn't one.
+    """
+    if not selected_data or not selected_data.get('range'):
+        return None
+    return selected_data['range']
+
+
+class SortedIndex:
+    '''
+    A column's values in sorted order, with the rows they came from.
+    '''
+
+    def __init__(self, values):
+        self.values = np.asarray(values)
+        self.order = np.argsort(self.values, kind='stable')
+        self.sorted = self.values[self.order]
+
+    def bounds(self, lo, hi):
+        '''
+        Returns the (start, stop) positions of the values in [lo, hi].
+        '''
+        return (
+            np.searchsorted(self.sorted, lo, side='left'),
+            np.searchsorted(self.sorted, hi, side='right')
+        )
+
+    def between(self, lo, hi):
+        '''
+        Returns the rows whose value is in [lo, hi], in value order.
+        '''
+        start, stop = self.bounds(lo, hi)
+        return self.order[start:stop]
+
+    def min(self):
+        return self.sorted[0]
+
+    def max(self):
+        return self.sorted[-1]
+
+
+def rectangle(x_index, y_index, x_range=None, y_range=None):
+    '''
+    Returns the rows inside a rectangle, given SortedIndexes on its two
+    columns. Either range may be None to leave that axis unbounded.
+
+    The rows matching the narrower of the two ranges are found by binary
+    search and then filtered on the other column.
+    '''
+    x0, x1 = x_range if x_range is not None else (x_index.min(), x_index.max())
+    y0, y1 = y_range if y_range is not None else (y_index.min(), y_index.max())
+
+    x_start, x_stop = x_index.bounds(x0, x1)
+    y_start, y_stop = y_index.bounds(y0, y1)
+
+    if x_stop - x_start <= y_stop - y_start:
+        rows = x_index.order[x_start:x_stop]
+        values = y_index.values[rows]
+        return rows[(values >= y0) & (values <= y1)]
+
+    rows = y_index.order[y_start:y_stop]
+    values = x_index.values[rows]
+    return rows[(values >= x0) & (values <= x1)]
+
+
+class SelectionEngine:
+
+    def __init__(self, n_rows, max_masks=16):
+        self.n_rows = n_rows
+        self.max_masks = max_masks
+        self._lock = threading.Lock()
+        # (chart, key) -> mask, least recently used first
+        self._masks = collections.OrderedDict()
+        self._last = None
+
+    def mask(self, indices):
+        '''
+        Returns a boolean mask with `indices` set, or None for no selection.
+        '''
+        if indices is None:
+            return None
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[indices] = True
+        return mask
+
+    def combine(self, masks):
+        '''
+        ANDs the masks that aren't None; returns None if they all are.
+        '''
+        combined = None
+        for mask in masks:
+            if mask is None:
+                continue
+            if combined is None:
+                combined = mask.copy()
+            else:
+                np.logical_and(combined, mask, out=combined)
+        return combined
+
+    def select(self, selections):
+        '''
+        Takes one array of selected row indices (or None) per chart and
+        returns the indices of the rows selected on every chart.
+        '''
+        active = [indices for indices in selections if indices is not None]
+        if not active:
+            return np.arange(self.n_rows)
+
+        # a single selection doesn't need masks, keeping it O(k)
+        if len(active) == 1:
+            return np.sort(active[0])
+
+        return np.flatnonzero(self.combine([self.mask(indices) for indices in active]))
+
+    def _cached_mask(self, chart, key, resolve):
+        with self._lock:
+            mask = self._masks.get((chart, key))
+            if mask is not None:
+                self._masks.move_to_end((chart, key))
+                return mask
+
+        mask = self.mask(resolve())
+        with self._lock:
+            self._masks[(chart, key)] = mask
+            while len(self._masks) > self.max_masks:
+                self._masks.popitem(last=False)
+        return mask
+
+    def select_keyed(self, selections):
+        '''
+        Like select, but takes one (key, resolve) pair per chart: `key` is a
+        hashable description of the chart's selection, or None for no
+        selection, and `resolve()` returns its row indices. Masks are cached
+        by chart and key, so resolve is only called for selections not seen
+        recently. The result is shared between calls, so don't modify it.
+        '''
+        keys = tuple(key for key, _ in selections)
+        with self._lock:
+            if self._last is not None and self._last[0] == keys:
+                return self._last[1]
+
+        active = [(chart, key, resolve) for chart, (key, resolve) in enumerate(selections) if key is not None]
+        if not active:
+            result = np.arange(self.n_rows)
+        elif len(active) == 1:
+            result = np.sort(active[0][2]())
+        else:
+            result = np.flatnonzero(self.combine([
+                self._cached_mask(chart, key, resolve) for chart, key, resolve in active
+            ]))
+
+        with self._lock:
+            self._last = (keys, result)
+        return result
@@ -0,0 +1,165 @@
+'''
+Per-session server-side state for callbacks.
+
+sharing_state/bad_way.py shows why callbacks can't keep per-user state in
+globals: users share them, and workers don't. The other examples ship state
+through the browser instead. A SessionStore keeps it on the server, keyed by
+the session cookie from utils.sessions and a name, in a SQLite file that
+every thread and worker process on the machine shares.
+
+Usage:
+
+    store = SessionStore(app, path)
+
+    @app.callback(...)
+    def filter_data(region):
+        store.set('filtered', df[df['region'] == region])
+        ...
+
+    @app.callback(...)
+    def summarise(metric, version):
+        filtered = store.get('filtered')
+        ...
+
+Values are pickled, so frames and any other picklable object can be stored.
+Only the server writes them, so nothing from the browser is unpickled.
+Entries expire `ttl` seconds after they were last read or written. Once a
+session holds more than `max_session_bytes`, or the store more than
+`max_bytes`, the least recently used entries are evicted.
+'''
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from utils import sessions
+
+_MISSING = object()
+
+
+class SessionStore:
+
+    def __init__(self, app, path, ttl=1800, max_bytes=256 * 2**20, max_session_bytes=32 * 2**20):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_session_bytes = max_session_bytes
+        self._local = threading.local()
+
+        sessions.install(app)
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS session_entries ('
+                'session TEXT, name TEXT, value BLOB, size INTEGER, accessed REAL, '
+                'PRIMARY KEY (session, name))'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS session_entries_accessed ON session_entries (accessed)'
+            )
+
+    def _connect(self):
+        # sqlite connections can't be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, name, default=None, session_id=None):
+        '''
+        Returns the value stored under `name` for the current session, or
+        `default` if there is none or it has expired.
+        '''
+        session_id = session_id or sessions.current_session_id()
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT value, accessed FROM session_entries WHERE session = ? AND name = ?',
+            (session_id, name)
+        ).fetchone()
+
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            return default
+
+        with conn:
+            conn.execute(
+                'UPDATE session_entries SET accessed = ? WHERE session = ? AND name = ?',
+                (now, session_id, name)
+            )
+        return pickle.loads(row[0])
+
+    def set(self, name, value, session_id=None):
+        '''
+        Stores `value` under `name` for the current session. Values bigger
+        than a session's budget are not stored.
+        '''
+        session_id = session_id or sessions.current_session_id()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > min(self.max_bytes, self.max_session_bytes):
+            self.delete(name, session_id)
+            return
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO session_entries VALUES (?, ?, ?, ?, ?)',
+                (session_id, name, blob, len(blob), time.time())
+            )
+            self._evict(conn, session_id)
+
+    def get_or_set(self, name, factory, session_id=None):
+        '''
+        Returns the value stored under `name`, storing `factory()` first if
+        there is none.
+        '''
+        value = self.get(name, _MISSING, session_id)
+        if value is _MISSING:
+            value = factory()
+            self.set(name, value, session_id)
+        return value
+
+    def delete(self, name, session_id=None):
+        session_id = session_id or sessions.current_session_id()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'DELETE FROM session_entries WHERE session = ? AND name = ?', (session_id, name)
+            )
+
+    def clear(self, session_id=None):
+        '''
+        Removes everything stored for the current session.
+        '''
+        session_id = session_id or sessions.current_session_id()
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM session_entries WHERE session = ?', (session_id,))
+
+    def _evict(self, conn, session_id):
+        conn.execute('DELETE FROM session_entries WHERE accessed < ?', (time.time() - self.ttl,))
+
+        # first the session that just grew, then the store as a whole
+        for where, args, budget in [
+            ('WHERE session = ?', (session_id,), self.max_session_bytes),
+            ('', (), self.max_bytes)
+        ]:
+            total = conn.execute(
+                f'SELECT COALESCE(SUM(size), 0) FROM session_entries {where}', args
+            ).fetchone()[0]
+            if total <= budget:
+                continue
+
+            evict = []
+            for session, name, size in conn.execute(
+                f'SELECT session, name, size FROM session_entries {where} ORDER BY accessed', args
+            ):
+                if total <= budget:
+                    break
+                evict.append((session, name))
+                total -= size
+            conn.executemany('DELETE FROM session_entries WHERE session = ? AND name = ?', evict)
@@ -0,0 +1,42 @@
+'''
+Minimal per-browser session ids for server-side helpers.
+
+Dash callbacks are stateless and carry no notion of a user. install() makes
+the Flask server hand each browser a random id in a cookie, and
+current_session_id() returns it while handling a request.
+'''
+
+import uuid
+
+import flask
+
+COOKIE = 'dash_tutorials_session'
+
+
+def install(app):
+    '''
+    Registers the cookie hooks on `app`; safe to call more than once.
+    '''
+    server = app.server
+    if COOKIE in server.extensions:
+        return
+    server.extensions[COOKIE] = True
+
+    @server.before_request
+    def load_session():
+        session_id = flask.request.cookies.get(COOKIE)
+        flask.g.new_session = session_id is None
+        flask.g.session_id = session_id or uuid.uuid4().hex
+
+    @server.after_request
+    def save_session(response):
+        if flask.g.get('new_session'):
+            response.set_cookie(COOKIE, flask.g.session_id, httponly=True, samesite='Lax')
+        return response
+
+
+def current_session_id():
+    '''
+    Returns the id of the session making the current request.
+    '''
+    return flask.g.get('session_id') or flask.request.remote_addr
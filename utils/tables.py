@@ -0,0 +1,29 @@
+'''
+HTML table rendering for DataFrames.
+
+Building each cell with dataframe.iloc[i][col] constructs a whole row Series
+per cell. These helpers take the column arrays once and zip them into rows,
+and only render the requested page of the frame.
+'''
+
+import math
+
+import dash_html_components as html
+
+
+def page_count(dataframe, page_size):
+    return max(1, math.ceil(len(dataframe) / page_size))
+
+
+def table_rows(dataframe, max_rows=10, page=0):
+    '''
+    Returns the header row and the html.Tr rows for one page of `dataframe`.
+    Pages outside the frame are clamped to the first or last page.
+    '''
+    page = min(max(int(page), 0), page_count(dataframe, max_rows) - 1)
+    window = dataframe.iloc[page * max_rows:(page + 1) * max_rows]
+    columns = [window.iloc[:, i].tolist() for i in range(window.shape[1])]
+
+    header = html.Tr([html.Th(col) for col in dataframe.columns])
+    body = [html.Tr([html.Td(value) for value in row]) for row in zip(*columns)]
+    return [header] + body